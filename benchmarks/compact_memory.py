@@ -0,0 +1,153 @@
+"""Compare the memory held by cached Holded collections as dicts vs CompactTable.
+
+Synthetic pages mimic the shape of Holded responses (contacts, products, daily
+ledger lines). Each collection is parsed with json.loads, as HoldedClient does,
+and measured with tracemalloc before and after compaction.
+
+    python benchmarks/compact_memory.py [--scale 1.0]
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+
+from holded_mcp.compact import CompactTable
+
+CITIES = ["Valencia", "Madrid", "Barcelona", "Sevilla", "Bilbao", "Zaragoza"]
+TAGS = ["wholesale", "retail", "vip", "export", "b2b"]
+
+
+def contacts(n: int) -> list[dict]:
+    return [
+        {
+            "id": f"{random.getrandbits(96):024x}",
+            "customId": f"C{i:06d}",
+            "name": f"Contact {i} S.L.",
+            "code": f"B{random.randint(10**7, 10**8 - 1)}",
+            "tradeName": f"Trade {i}",
+            "email": f"contact{i}@example.com",
+            "mobile": f"6{random.randint(10**7, 10**8 - 1)}",
+            "phone": "",
+            "type": random.choice(["client", "supplier", "lead"]),
+            "iban": "",
+            "swift": "",
+            "clientRecord": 0,
+            "supplierRecord": 0,
+            "billAddress": {
+                "address": f"Calle {i}",
+                "city": random.choice(CITIES),
+                "postalCode": f"{random.randint(1000, 52999):05d}",
+                "province": random.choice(CITIES),
+                "country": "España",
+                "countryCode": "ES",
+            },
+            "defaults": {
+                "dueDays": 30, "paymentMethod": 0, "discount": 0,
+                "currency": "eur", "language": "es", "salesTax": [], "purchasesTax": [],
+            },
+            "socialNetworks": {"website": ""},
+            "tags": random.sample(TAGS, 2),
+            "notes": [],
+            "contactPersons": [],
+            "shippingAddresses": [],
+            "customFields": [],
+        }
+        for i in range(n)
+    ]
+
+
+def products(n: int) -> list[dict]:
+    return [
+        {
+            "id": f"{random.getrandbits(96):024x}",
+            "kind": "simple",
+            "name": f"Product {i}",
+            "desc": "",
+            "typeId": "",
+            "contactId": "",
+            "contactName": "",
+            "price": round(random.uniform(1, 500), 2),
+            "tax": 21,
+            "total": round(random.uniform(1, 600), 2),
+            "rates": [],
+            "hasStock": 1,
+            "stock": random.randint(0, 1000),
+            "barcode": f"{random.randint(10**12, 10**13 - 1)}",
+            "sku": f"SKU-{i:06d}",
+            "cost": round(random.uniform(1, 300), 2),
+            "purchasePrice": round(random.uniform(1, 300), 2),
+            "weight": 0,
+            "tags": random.sample(TAGS, 1),
+            "categoryId": "",
+            "factoryCode": "",
+            "forSale": 1,
+            "forPurchase": 1,
+            "salesChannelId": "",
+            "expAccountId": "",
+            "warehouseId": "",
+        }
+        for i in range(n)
+    ]
+
+
+def ledger(n: int) -> list[dict]:
+    return [
+        {
+            "entryNumber": i // 2 + 1,
+            "line": i % 2 + 1,
+            "timestamp": 1_700_000_000 + i * 60,
+            "type": "basic",
+            "description": f"Factura F{i // 2:06d}",
+            "docDescription": "",
+            "account": random.choice([43000001, 70000001, 47700001, 57200001]),
+            "debit": round(random.uniform(0, 1000), 2),
+            "credit": 0.0,
+            "tags": [],
+            "checked": "no",
+        }
+        for i in range(n)
+    ]
+
+
+def measure(build) -> tuple[object, int]:
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply the row counts")
+    args = parser.parse_args()
+    random.seed(42)
+
+    print(f"{'collection':<12} {'rows':>8} {'dicts MiB':>10} {'compact MiB':>12} {'ratio':>6} {'compact s':>10} {'to_dicts s':>11}")
+    for name, gen, rows in [("contacts", contacts, 50_000), ("products", products, 20_000), ("ledger", ledger, 200_000)]:
+        rows = int(rows * args.scale)
+        text = json.dumps(gen(rows))
+        dicts, dict_bytes = measure(lambda: json.loads(text))
+        compact, compact_bytes = measure(lambda: CompactTable.from_records(json.loads(text)))
+        # Timings are taken outside tracemalloc, which slows allocation-heavy code a lot.
+        start = time.perf_counter()
+        CompactTable.from_records(dicts)
+        build_s = time.perf_counter() - start
+        del dicts
+        start = time.perf_counter()
+        compact.to_dicts()
+        restore_s = time.perf_counter() - start
+        print(
+            f"{name:<12} {rows:>8} {dict_bytes / 2**20:>10.1f} {compact_bytes / 2**20:>12.1f}"
+            f" {dict_bytes / compact_bytes:>5.1f}x {build_s:>10.2f} {restore_s:>11.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from holded_mcp.compact import COMPACT_MIN_ROWS, CompactTable, is_record_list
+
+logger = logging.getLogger("holded_mcp")
+
+CacheKey = tuple[str, str, tuple[tuple[str, str], ...]]
+
+DEFAULT_TTL = 60.0
+DEFAULT_MAX_ENTRIES = 2048
+DEFAULT_DISK_MAX_BYTES = 64 * 1024 * 1024
+BUSY_TIMEOUT = 0.05  # seconds to wait for another process's write lock before giving up
+
+# (module, collection) -> TTL in seconds. GETs of these collections and of single
+# records in them ("/contacts", "/contacts/{id}") are cached automatically once the
+# disk tier is enabled. Sub-resources ("/projects/{id}/tasks", "/employees/{id}/times")
+# and other endpoints (documents, ledger) change too often, or are written through
+# other collections, so they are never served from a cache without being asked.
+ENDPOINT_TTLS: dict[tuple[str, str], float] = {
+    ("accounting", "/chartofaccounts"): 300.0,
+    ("accounting", "/accounts"): 3600.0,
+    ("invoicing", "/treasury"): 3600.0,
+    ("invoicing", "/contacts"): 600.0,
+    ("invoicing", "/products"): 600.0,
+    ("crm", "/funnels"): 3600.0,
+    ("projects", "/projects"): 600.0,
+    ("team", "/employees"): 1800.0,
+}
+
+# Writes to a collection that change data served by other collections.
+RELATED_COLLECTIONS: dict[tuple[str, str], tuple[str, ...]] = {
+    ("accounting", "/account"): ("/chartofaccounts", "/accounts"),
+    ("accounting", "/entry"): ("/chartofaccounts", "/accounts", "/dailyledger"),
+    ("invoicing", "/documents"): ("/treasury",),
+}
+
+
+def cache_key(module: str, path: str, params: dict[str, Any] | None = None) -> CacheKey:
+    return module, path, tuple(sorted((k, str(v)) for k, v in (params or {}).items()))
+
+
+def collection_of(path: str) -> str:
+    """Return the top-level collection of a path, e.g. "/contacts/123" -> "/contacts"."""
+    return "/" + path.lstrip("/").split("/", 1)[0]
+
+
+def endpoint_ttl(module: str, path: str) -> float | None:
+    if path.strip("/").count("/") > 1:
+        return None
+    return ENDPOINT_TTLS.get((module, collection_of(path)))
+
+
+def invalidation_targets(module: str, path: str) -> list[str]:
+    """Collections whose cached responses a write to ``path`` makes stale."""
+    collection = collection_of(path)
+    return [collection, *RELATED_COLLECTIONS.get((module, collection), ())]
+
+
+class ResponseCache:
+    """Bounded in-memory LRU cache of GET responses with per-entry TTLs.
+
+    With ``compact=True`` (``HoldedClient.get_compact``), lists of at least
+    ``COMPACT_MIN_ROWS`` objects are stored as a :class:`CompactTable`; every other
+    response, including the pages served by the list tools, is kept as parsed.
+    :meth:`get` returns the stored form as-is.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[CacheKey, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: CacheKey) -> tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: CacheKey, value: Any, ttl: float = DEFAULT_TTL, compact: bool = False) -> Any:
+        """Store ``value`` and return the form it is stored in."""
+        if compact and isinstance(value, list) and len(value) >= COMPACT_MIN_ROWS and is_record_list(value):
+            value = CompactTable.from_records(value)
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, module: str, prefix: str) -> None:
+        """Drop every entry of ``module`` whose path is ``prefix`` or lies below it."""
+        stale = [
+            key for key in self._entries
+            if key[0] == module and (key[1] == prefix or key[1].startswith(prefix + "/"))
+        ]
+        for key in stale:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskCache:
+    """SQLite-backed response cache shared by every server process on the host.
+
+    Values are zlib-compressed JSON, stored per ``namespace`` (a hash of the API
+    key) so processes configured for different Holded accounts never see each
+    other's data. The database runs in WAL mode. Methods are blocking; callers on
+    the event loop run them in a worker thread (``asyncio.to_thread``). When
+    another process holds the write lock for longer than ``BUSY_TIMEOUT``, reads
+    are misses and writes are skipped. A failed invalidation is retried on the
+    next call, and until it succeeds the entries it covers are treated as misses.
+    When the total value size exceeds ``max_bytes`` the least recently used
+    entries are evicted.
+    """
+
+    SCHEMA_VERSION = 2
+    _EVICT_EVERY = 64  # writes between size checks
+    _TOUCH_AFTER = 60.0  # seconds before a read refreshes an entry's access time
+
+    def __init__(
+        self, path: str | Path, max_bytes: int = DEFAULT_DISK_MAX_BYTES, namespace: str = ""
+    ) -> None:
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.namespace = namespace
+        self._writes = 0
+        self._stale: set[tuple[str, str]] = set()  # (module, prefix) invalidations not yet applied
+        self._lock = threading.Lock()  # one connection, used from worker threads
+        self._db = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        if self._db.execute("PRAGMA user_version").fetchone()[0] != self.SCHEMA_VERSION:
+            self._db.execute("DROP TABLE IF EXISTS entries")  # only cached data is lost
+            self._db.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, namespace TEXT NOT NULL, module TEXT NOT NULL, path TEXT NOT NULL,"
+            " value BLOB NOT NULL, size INTEGER NOT NULL, expires REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_path ON entries (namespace, module, path)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+
+    def _key(self, key: CacheKey) -> str:
+        return json.dumps((self.namespace, *key), separators=(",", ":"))
+
+    def get(self, key: CacheKey) -> tuple[bool, Any, float]:
+        """Return ``(hit, value, remaining_ttl)``. A database locked by another process is a miss."""
+        k = self._key(key)
+        with self._lock:
+            if self._stale and not self._flush_stale() and self._is_stale(key):
+                return False, None, 0.0
+            try:
+                row = self._db.execute("SELECT value, expires, accessed FROM entries WHERE key = ?", (k,)).fetchone()
+            except sqlite3.OperationalError:
+                return False, None, 0.0
+            if row is None:
+                return False, None, 0.0
+            blob, expires, accessed = row
+            now = time.time()
+            if expires <= now:
+                return False, None, 0.0
+            if now - accessed > self._TOUCH_AFTER:
+                try:
+                    self._db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, k))
+                except sqlite3.OperationalError:
+                    pass
+        return True, json.loads(zlib.decompress(blob)), expires - now
+
+    def set(self, key: CacheKey, value: Any, ttl: float) -> None:
+        blob = zlib.compress(json.dumps(value, separators=(",", ":")).encode())
+        now = time.time()
+        with self._lock:
+            if self._stale and not self._flush_stale() and self._is_stale(key):
+                return  # the older, stale entry is still on disk; do not mix generations
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO entries (key, namespace, module, path, value, size, expires, accessed)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (self._key(key), self.namespace, key[0], key[1], blob, len(blob), now + ttl, now),
+                )
+                self._writes += 1
+                if self._writes % self._EVICT_EVERY == 1:
+                    self._evict()
+            except sqlite3.OperationalError:
+                pass  # another process holds the write lock; skip caching this response
+
+    def evict(self) -> None:
+        """Drop expired entries, then least recently used ones beyond ``max_bytes``."""
+        with self._lock:
+            try:
+                self._evict()
+            except sqlite3.OperationalError:
+                pass  # retried after the next batch of writes
+
+    def _evict(self) -> None:
+        self._db.execute("DELETE FROM entries WHERE expires <= ?", (time.time(),))
+        self._db.execute(
+            "DELETE FROM entries WHERE key IN ("
+            " SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY accessed DESC, key) AS total FROM entries)"
+            " WHERE total > ?)",
+            (self.max_bytes,),
+        )
+
+    def invalidate(self, module: str, prefix: str) -> None:
+        """Drop this namespace's entries of ``module`` at or below ``prefix``.
+
+        Never raises for a locked database: the invalidation is remembered and
+        retried, and matching entries are misses until it has been applied.
+        """
+        with self._lock:
+            self._stale.add((module, prefix))
+            if not self._flush_stale():
+                logger.warning("disk cache locked; invalidation of %s %s deferred", module, prefix)
+
+    def _flush_stale(self) -> bool:
+        """Apply pending invalidations; return True when none are left."""
+        for module, prefix in list(self._stale):
+            try:
+                # "/" + 1 == "0": the range covers every path strictly below ``prefix``.
+                self._db.execute(
+                    "DELETE FROM entries WHERE namespace = ? AND module = ?"
+                    " AND (path = ? OR (path >= ? AND path < ?))",
+                    (self.namespace, module, prefix, prefix + "/", prefix + "0"),
+                )
+            except sqlite3.OperationalError:
+                return False
+            self._stale.discard((module, prefix))
+        return True
+
+    def _is_stale(self, key: CacheKey) -> bool:
+        module, path = key[0], key[1]
+        return any(
+            module == m and (path == prefix or path.startswith(prefix + "/")) for m, prefix in self._stale
+        )
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            try:
+                entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            except sqlite3.OperationalError:
+                entries = size = None
+            pending = len(self._stale)
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "pending_invalidations": pending,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -1,10 +1,30 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import os
+from collections import Counter
+from collections.abc import AsyncIterator
 from typing import Any
 
 import httpx
 
+from holded_mcp.cache import (
+    DEFAULT_DISK_MAX_BYTES,
+    DEFAULT_TTL,
+    CacheKey,
+    DiskCache,
+    ResponseCache,
+    cache_key,
+    collection_of,
+    endpoint_ttl,
+    invalidation_targets,
+)
+from holded_mcp.compact import CompactTable, is_record_list
+from holded_mcp.resilience import ModuleGuard
+from holded_mcp.tracing import Tracer, record_phase
+
 BASE_URLS = {
     "invoicing": "https://api.holded.com/api/invoicing/v1",
     "crm": "https://api.holded.com/api/crm/v1",
@@ -14,6 +34,10 @@ BASE_URLS = {
 }
 
 
+class _LeaderCancelled(Exception):
+    """Set on a shared in-flight GET whose fetching caller was cancelled."""
+
+
 class HoldedClient:
     def __init__(self, api_key: str | None = None, allowed_methods: str | None = None) -> None:
         self.api_key = api_key or os.environ.get("HOLDED_API_KEY", "")
@@ -24,10 +48,27 @@ class HoldedClient:
             None if raw.strip().upper() == "ALL"
             else {m.strip().upper() for m in raw.split(",") if m.strip()}
         )
+        self.tracer = Tracer.from_env()
         self._client = httpx.AsyncClient(
             headers={"key": self.api_key, "Content-Type": "application/json"},
             timeout=30.0,
+            event_hooks=self.tracer.event_hooks() if self.tracer.enabled else None,
+        )
+        self.cache = ResponseCache()
+        cache_path = os.environ.get("HOLDED_CACHE_PATH")
+        self.disk_cache: DiskCache | None = (
+            DiskCache(
+                cache_path,
+                int(os.environ.get("HOLDED_CACHE_MAX_BYTES", DEFAULT_DISK_MAX_BYTES)),
+                namespace=hashlib.sha256(self.api_key.encode()).hexdigest()[:16],
+            )
+            if cache_path else None
         )
+        self._inflight: dict[CacheKey, asyncio.Future[Any]] = {}
+        # (module, collection) -> number of writes that invalidated it; a GET whose
+        # collection changed while it was in flight must not cache what it read
+        self._generations: Counter[tuple[str, str]] = Counter()
+        self._guards = {module: ModuleGuard(module) for module in BASE_URLS}
 
     def _check_method(self, method: str) -> None:
         if self._allowed_methods is not None and method not in self._allowed_methods:
@@ -38,32 +79,209 @@ class HoldedClient:
     def _url(self, path: str, module: str = "invoicing") -> str:
         return f"{BASE_URLS[module]}{path}"
 
-    async def get(self, path: str, *, module: str = "invoicing", params: dict[str, Any] | None = None) -> Any:
+    async def _request(self, method: str, path: str, module: str, **kwargs: Any) -> Any:
+        """Send a request through the module's adaptive limiter and circuit breaker."""
+        url = self._url(path, module)
+        with self.tracer.http_span(method, url) as span:
+            resp = await self._guards[module].run(lambda: self._client.request(method, url, **kwargs))
+            resp.raise_for_status()
+            if span is None:
+                return resp.json()
+            span.mark("decode")
+            data = resp.json()
+            record_phase(span, "json_decode", "decode")
+            return data
+
+    async def _invalidate(self, module: str, path: str) -> None:
+        targets = invalidation_targets(module, path)
+        for prefix in targets:
+            self._generations[module, prefix] += 1
+            # GETs issued from now on must not join a request that may predate the write.
+            for key in [k for k in self._inflight if k[0] == module and collection_of(k[1]) == prefix]:
+                del self._inflight[key]
+        for prefix in targets:
+            self.cache.invalidate(module, prefix)
+            if self.disk_cache is not None:
+                await asyncio.to_thread(self.disk_cache.invalidate, module, prefix)
+
+    async def diagnostics(self) -> dict[str, Any]:
+        """Return limiter and circuit breaker state of every module, plus cache sizes."""
+        return {
+            "modules": {module: guard.snapshot() for module, guard in self._guards.items()},
+            "cache": {
+                "memory_entries": len(self.cache),
+                "disk": await asyncio.to_thread(self.disk_cache.stats) if self.disk_cache is not None else None,
+            },
+        }
+
+    async def get(
+        self,
+        path: str,
+        *,
+        module: str = "invoicing",
+        params: dict[str, Any] | None = None,
+        cached: bool = False,
+        ttl: float | None = None,
+    ) -> Any:
+        """GET a resource. With ``cached=True`` the response is served from and stored in
+        the shared response cache, and concurrent identical requests share one round trip.
+
+        When the disk cache is enabled (HOLDED_CACHE_PATH), endpoints listed in
+        ``ENDPOINT_TTLS`` are cached in both tiers even without ``cached=True``.
+        """
         self._check_method("GET")
-        resp = await self._client.get(self._url(path, module), params=params)
-        resp.raise_for_status()
-        return resp.json()
+        disk_ttl = endpoint_ttl(module, path) if self.disk_cache is not None else None
+        if not cached and disk_ttl is None:
+            return await self._fetch(path, module, params)
+        value = await self._get_cached(path, module, params, ttl, disk_ttl)
+        # Only when get_compact() cached this key first; plain gets store the dicts.
+        return value.to_dicts() if isinstance(value, CompactTable) else value
+
+    async def get_compact(
+        self,
+        path: str,
+        *,
+        module: str = "invoicing",
+        params: dict[str, Any] | None = None,
+        ttl: float | None = None,
+        refresh: bool = False,
+    ) -> CompactTable:
+        """Cached GET of a collection, returned in its compact columnar form.
+
+        Use this instead of ``get(cached=True)`` when only a few columns of a large
+        collection are needed; the rows are never materialized as dicts, and the
+        cache holds the compact form rather than the dicts. ``refresh=True`` skips
+        the cached copy and replaces it with a fresh one.
+        """
+        self._check_method("GET")
+        disk_ttl = endpoint_ttl(module, path) if self.disk_cache is not None else None
+        value = await self._get_cached(path, module, params, ttl, disk_ttl, compact=True, refresh=refresh)
+        if isinstance(value, CompactTable):
+            return value
+        return CompactTable.from_records(value if is_record_list(value) else [value])
+
+    async def _get_cached(
+        self,
+        path: str,
+        module: str,
+        params: dict[str, Any] | None,
+        ttl: float | None,
+        disk_ttl: float | None,
+        compact: bool = False,
+        refresh: bool = False,
+    ) -> Any:
+        """Return the cached form of a GET response (possibly a CompactTable), fetching it on a miss.
+
+        With ``refresh=True`` cached copies and requests already in flight are ignored.
+        """
+        ttl = ttl if ttl is not None else disk_ttl or DEFAULT_TTL
+        # Other processes only invalidate the shared disk tier, so keep the private
+        # memory tier short-lived for disk-backed endpoints.
+        memory_ttl = min(ttl, DEFAULT_TTL) if disk_ttl is not None else ttl
+        key = cache_key(module, path, params)
+        hit, value = self.cache.get(key) if not refresh else (False, None)
+        if hit:
+            return value
+        generation = (module, collection_of(path))
+        seen = self._generations[generation]
+        if disk_ttl is not None and not refresh:
+            hit, value, remaining = await asyncio.to_thread(self.disk_cache.get, key)
+            if hit:
+                if self._generations[generation] != seen:
+                    return value  # read before a write that just landed; don't keep it
+                return self.cache.set(key, value, min(remaining, memory_ttl), compact)
+        pending = self._inflight.get(key) if not refresh else None
+        while pending is not None:
+            try:
+                return await asyncio.shield(pending)
+            except _LeaderCancelled:
+                # The caller doing the fetch went away; take over (or join whoever did).
+                pending = self._inflight.get(key)
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._fetch(path, module, params)
+        except asyncio.CancelledError:
+            # Waiters are not cancelled with us: they retry the fetch themselves.
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        else:
+            if self._generations[generation] != seen:
+                # A write invalidated the collection while this GET was in flight:
+                # the response may predate it, so hand it out but never cache it.
+                future.set_result(value)
+                return value
+            stored = self.cache.set(key, value, memory_ttl, compact)
+            future.set_result(stored)
+            if disk_ttl is not None:
+                await asyncio.to_thread(self.disk_cache.set, key, value, ttl)
+                if self._generations[generation] != seen:  # a write raced the disk insert
+                    await asyncio.to_thread(self.disk_cache.invalidate, *generation)
+            return stored
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def _fetch(self, path: str, module: str, params: dict[str, Any] | None) -> Any:
+        return await self._request("GET", path, module, params=params)
 
     async def post(self, path: str, *, module: str = "invoicing", json: dict[str, Any] | None = None) -> Any:
         self._check_method("POST")
-        resp = await self._client.post(self._url(path, module), json=json)
-        resp.raise_for_status()
-        return resp.json()
+        result = await self._request("POST", path, module, json=json)
+        await self._invalidate(module, path)
+        return result
 
     async def put(self, path: str, *, module: str = "invoicing", json: dict[str, Any] | None = None) -> Any:
         self._check_method("PUT")
-        resp = await self._client.put(self._url(path, module), json=json)
-        resp.raise_for_status()
-        return resp.json()
+        result = await self._request("PUT", path, module, json=json)
+        await self._invalidate(module, path)
+        return result
 
     async def delete(self, path: str, *, module: str = "invoicing") -> Any:
         self._check_method("DELETE")
-        resp = await self._client.delete(self._url(path, module))
-        resp.raise_for_status()
-        return resp.json()
+        result = await self._request("DELETE", path, module)
+        await self._invalidate(module, path)
+        return result
 
     async def list_paginated(self, path: str, *, module: str = "invoicing", page: int = 1) -> Any:
         return await self.get(path, module=module, params={"page": page})
 
+    async def iter_pages(
+        self, path: str, *, module: str = "invoicing", params: dict[str, Any] | None = None
+    ) -> AsyncIterator[list[Any]]:
+        """Yield successive pages of a paginated endpoint until an empty page is returned.
+
+        Endpoints that ignore the ``page`` parameter (and therefore return the same
+        rows every time) are detected by comparing each page's first row with the
+        first page's, and yielded only once. Pages always bypass the response cache
+        so bulk reads neither see stale rows nor flush useful entries.
+        """
+        self._check_method("GET")
+        page = 1
+        first_row = ""
+        while True:
+            rows = await self._fetch(path, module, {**(params or {}), "page": page})
+            if not isinstance(rows, list):
+                if rows:
+                    yield [rows]
+                return
+            if not rows:
+                return
+            # The whole row, not its "id": some rows (e.g. ledger lines) have none.
+            head = json.dumps(rows[0], sort_keys=True, default=str)
+            if page == 1:
+                first_row = head
+            elif head == first_row:
+                return
+            yield rows
+            page += 1
+
     async def close(self) -> None:
         await self._client.aclose()
+        if self.disk_cache is not None:
+            self.disk_cache.close()
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import json
+import sys
+from array import array
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+COMPACT_MIN_ROWS = 64  # shorter lists are cheaper to keep as plain dicts
+INTERN_MAX_LEN = 64  # longer strings are rarely repeated (notes, descriptions)
+
+_INT64_MIN, _INT64_MAX = -(2**63), 2**63 - 1
+
+
+class _Missing:
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "<missing>"
+
+
+MISSING: Any = _Missing()
+
+
+def is_record_list(value: Any) -> bool:
+    return isinstance(value, list) and all(isinstance(v, dict) for v in value)
+
+
+class CompactTable:
+    """Column-oriented, memory-compact form of a list of JSON objects.
+
+    Nested objects (e.g. ``billAddress``) are flattened into one column per leaf
+    path. Integer and float columns without gaps are stored as ``array`` buffers,
+    short strings are interned so repeated values (country, currency, type...)
+    share one object, and arrays (e.g. ``products``, ``tags``) are kept as compact
+    JSON bytes. Rows are rebuilt as dicts only when a caller asks for them.
+    """
+
+    __slots__ = ("_paths", "_columns", "_length", "_distinct")
+
+    def __init__(self) -> None:
+        self._paths: list[tuple[str, ...]] = []
+        self._columns: list[Any] = []
+        self._length = 0
+        self._distinct: dict[str, frozenset[Any]] = {}
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict[str, Any]]) -> CompactTable:
+        table = cls()
+        index: dict[tuple[str, ...], int] = {}
+        for row, record in enumerate(records):
+            for path, value in _leaves(record, ()):
+                col = index.get(path)
+                if col is None:
+                    col = index[path] = len(table._paths)
+                    table._paths.append(path)
+                    table._columns.append([MISSING] * row)
+                column = table._columns[col]
+                if len(column) < row:
+                    column.extend([MISSING] * (row - len(column)))
+                column.append(_pack(value))
+            table._length = row + 1
+        for i, column in enumerate(table._columns):
+            column.extend([MISSING] * (table._length - len(column)))
+            table._columns[i] = _narrow(column)
+        return table
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int) -> CompactRecord:
+        if not -self._length <= index < self._length:
+            raise IndexError(index)
+        return CompactRecord(self, index % self._length if self._length else 0)
+
+    def __iter__(self) -> Iterator[CompactRecord]:
+        return (CompactRecord(self, i) for i in range(self._length))
+
+    def column(self, name: str) -> list[Any]:
+        """Values of a top-level or dotted leaf column (e.g. "billAddress.city"); None where absent."""
+        path = tuple(name.split("."))
+        try:
+            column = self._columns[self._paths.index(path)]
+        except ValueError:
+            return [None] * self._length
+        return [None if v is MISSING else _unpack(v) for v in column]
+
+    def distinct(self, name: str) -> frozenset[Any]:
+        """Set of values of a column, computed once and remembered (e.g. for membership checks)."""
+        values = self._distinct.get(name)
+        if values is None:
+            values = self._distinct[name] = frozenset(
+                v for v in self.column(name) if v is not None and not isinstance(v, (list, dict))
+            )
+        return values
+
+    def row(self, index: int) -> dict[str, Any]:
+        out: dict[str, Any] = {}
+        for path, column in zip(self._paths, self._columns):
+            value = column[index]
+            if value is MISSING:
+                continue
+            target = out
+            for key in path[:-1]:
+                target = target.setdefault(key, {})
+            target[path[-1]] = _unpack(value)
+        return out
+
+    def to_dicts(self) -> list[dict[str, Any]]:
+        return [self.row(i) for i in range(self._length)]
+
+
+class CompactRecord:
+    """Lazy view of one row of a :class:`CompactTable`; ``to_dict()`` materializes it."""
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: CompactTable, index: int) -> None:
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key: str) -> Any:
+        table, found, nested = self._table, False, {}
+        for path, column in zip(table._paths, table._columns):
+            if path[0] != key:
+                continue
+            value = column[self._index]
+            if value is MISSING:
+                continue
+            if len(path) == 1:
+                return _unpack(value)
+            found = True
+            target = nested
+            for part in path[1:-1]:
+                target = target.setdefault(part, {})
+            target[path[-1]] = _unpack(value)
+        if found:
+            return nested
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self) -> dict[str, Any]:
+        return self._table.row(self._index)
+
+
+def _leaves(obj: dict[str, Any], prefix: tuple[str, ...]) -> Iterator[tuple[tuple[str, ...], Any]]:
+    for key, value in obj.items():
+        path = (*prefix, key)
+        if isinstance(value, dict) and value:
+            yield from _leaves(value, path)
+        else:
+            yield path, value
+
+
+_JSON_MEMO_MAX = 4096
+_json_memo: dict[str, bytes] = {}
+
+
+def _pack(value: Any) -> Any:
+    if isinstance(value, str):
+        return sys.intern(value) if len(value) <= INTERN_MAX_LEN else value
+    if isinstance(value, (list, dict)):  # arrays and empty objects
+        text = json.dumps(value, separators=(",", ":"))
+        if len(text) > INTERN_MAX_LEN:
+            return text.encode()
+        # Short encodings ("[]", '["vip"]'...) repeat across rows: share one bytes object.
+        encoded = _json_memo.get(text)
+        if encoded is None:
+            encoded = text.encode()
+            if len(_json_memo) < _JSON_MEMO_MAX:
+                _json_memo[text] = encoded
+        return encoded
+    return value
+
+
+def _unpack(value: Any) -> Any:
+    return json.loads(value) if isinstance(value, bytes) else value
+
+
+class _StrColumn:
+    """Gap-free, mostly unique strings (ids, names, emails) packed into one UTF-8 buffer."""
+
+    __slots__ = ("_data", "_offsets")
+
+    def __init__(self, values: list[str]) -> None:
+        encoded = [v.encode() for v in values]
+        offsets = array("q", [0])
+        for item in encoded:
+            offsets.append(offsets[-1] + len(item))
+        self._data = b"".join(encoded)
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return self._data[self._offsets[index]:self._offsets[index + 1]].decode()
+
+    def __iter__(self) -> Iterator[str]:
+        return (self[i] for i in range(len(self)))
+
+
+def _narrow(column: list[Any]) -> Any:
+    """Replace a list of objects by a typed buffer when the column allows it.
+
+    Gap-free int64 and float columns become ``array`` buffers; gap-free string
+    columns with mostly distinct values become a :class:`_StrColumn`. Columns with
+    repeated strings stay lists of interned (shared) strings.
+    """
+    if not column:
+        return column
+    first = type(column[0])
+    if first is int and all(type(v) is int and _INT64_MIN <= v <= _INT64_MAX for v in column):
+        return array("q", column)
+    if first is float and all(type(v) is float for v in column):
+        return array("d", column)
+    if first is str and all(type(v) is str for v in column) and len(set(column)) * 2 > len(column):
+        return _StrColumn(column)
+    return column
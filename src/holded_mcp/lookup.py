@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Iterable
+from typing import Any
+
+import httpx
+
+from holded_mcp.client import HoldedClient
+
+DEFAULT_CONCURRENCY = 8
+
+
+async def resolve_ids(
+    client: HoldedClient,
+    ids: Iterable[Any],
+    path_for: Callable[[str], str],
+    *,
+    module: str = "invoicing",
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> dict[str, Any]:
+    """Fetch each unique ID once through the client's response cache.
+
+    Empty IDs (see :func:`is_empty_id`) are skipped and duplicates collapse to a single request; at most
+    ``concurrency`` requests are in flight at a time. Returns a mapping from ID to
+    the fetched object, or to the exception raised while fetching it.
+    """
+    unique = list(dict.fromkeys(str(i) for i in ids if not is_empty_id(i)))
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def fetch(entity_id: str) -> Any:
+        async with semaphore:
+            try:
+                return await client.get(path_for(entity_id), module=module, cached=True)
+            except Exception as exc:
+                return exc
+
+    results = await asyncio.gather(*(fetch(i) for i in unique))
+    return dict(zip(unique, results))
+
+
+def is_empty_id(entity_id: Any) -> bool:
+    return entity_id is None or not str(entity_id).strip()
+
+
+def describe_error(exc: Exception) -> str:
+    """Short, user-facing reason for a failed lookup, e.g. "HTTP 404"."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return f"HTTP {exc.response.status_code}"
+    return f"{type(exc).__name__}: {exc}"
+
+
+def pick(obj: Any, fields: Iterable[str]) -> dict[str, Any]:
+    """Return the selected top-level fields of ``obj`` that are present."""
+    if not isinstance(obj, dict):
+        return {}
+    return {field: obj[field] for field in fields if field in obj}
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import httpx
+
+# Per-module bounds. Five modules at the maximum stay below httpx's default pool
+# of 100 connections, so one degraded module can never starve the others.
+MIN_CONCURRENCY = 1
+MAX_CONCURRENCY = 16
+INITIAL_CONCURRENCY = 8
+TARGET_LATENCY = 2.0  # seconds; slower responses count as congestion
+DECREASE_FACTOR = 0.5
+
+FAILURE_THRESHOLD = 5  # consecutive failures that open the circuit
+RESET_TIMEOUT = 30.0  # seconds the circuit stays open before a probe is allowed
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a Holded module whose circuit breaker is open."""
+
+
+class AdaptiveLimiter:
+    """Concurrency limiter with AIMD (additive increase, multiplicative decrease) limits.
+
+    Every fast, successful call raises the limit by 1/limit (about +1 per window of
+    calls). A failure or a call slower than ``target_latency`` multiplies it by
+    ``decrease_factor``, at most once per ``target_latency`` so that a burst of
+    failures from the same congestion episode is only counted once.
+    """
+
+    def __init__(
+        self,
+        initial: int = INITIAL_CONCURRENCY,
+        min_limit: int = MIN_CONCURRENCY,
+        max_limit: int = MAX_CONCURRENCY,
+        target_latency: float = TARGET_LATENCY,
+        decrease_factor: float = DECREASE_FACTOR,
+    ) -> None:
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self.latency_ewma: float | None = None
+        self._last_decrease = 0.0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self, latency: float, ok: bool | None) -> None:
+        """Release a slot. ``ok=None`` (e.g. caller cancelled) leaves the limit unchanged."""
+        async with self._cond:
+            self.in_flight -= 1
+            if ok is not None:
+                self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+                now = time.monotonic()
+                if ok and latency <= self.target_latency:
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+                elif now - self._last_decrease >= self.target_latency:
+                    self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                    self._last_decrease = now
+            self._cond.notify_all()
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "latency_ewma_ms": None if self.latency_ewma is None else round(self.latency_ewma * 1000, 1),
+        }
+
+
+class CircuitBreaker:
+    """Closed -> open after ``failure_threshold`` consecutive failures; after
+    ``reset_timeout`` a single half-open probe decides whether to close again.
+    """
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def before_call(self, name: str) -> bool:
+        """Raise if calls are currently rejected; return True if this call is the recovery probe."""
+        if self.state == "open":
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0:
+                raise CircuitOpenError(
+                    f"Holded {name} API is unavailable (circuit open, retry in {remaining:.1f}s)"
+                )
+            self.state = "half_open"
+        if self.state == "half_open":
+            if self._probing:
+                raise CircuitOpenError(f"Holded {name} API is recovering (probe in progress)")
+            self._probing = True
+            return True
+        return False
+
+    def record(self, ok: bool | None, probe: bool = False) -> None:
+        """Record a call outcome. ``ok=None`` (e.g. caller cancelled) is neutral."""
+        if probe:
+            self._probing = False
+        if ok is None:
+            return
+        if ok:
+            self.failures = 0
+            if probe:
+                self.state = "closed"
+            return
+        self.failures += 1
+        # Stragglers finishing after the circuit opened must not extend or close it.
+        if probe or (self.state == "closed" and self.failures >= self.failure_threshold):
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def snapshot(self) -> dict[str, Any]:
+        snap: dict[str, Any] = {"state": self.state, "consecutive_failures": self.failures}
+        if self.state == "open":
+            snap["retry_in_s"] = round(max(0.0, self.opened_at + self.reset_timeout - time.monotonic()), 1)
+        return snap
+
+
+def is_failure(resp: httpx.Response) -> bool:
+    """Server errors and rate limiting indicate an unhealthy module; other 4xx do not."""
+    return resp.status_code >= 500 or resp.status_code == 429
+
+
+class ModuleGuard:
+    """Adaptive limiter and circuit breaker protecting one Holded API module."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.limiter = AdaptiveLimiter()
+        self.breaker = CircuitBreaker()
+        self.calls = 0
+        self.errors = 0
+        self.rejected = 0
+
+    async def run(self, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        try:
+            probe = self.breaker.before_call(self.name)
+        except CircuitOpenError:
+            self.rejected += 1
+            raise
+        ok: bool | None = None
+        try:
+            await self.limiter.acquire()
+        except BaseException:
+            self.breaker.record(None, probe)
+            raise
+        start = time.monotonic()
+        try:
+            resp = await send()
+            ok = not is_failure(resp)
+            return resp
+        except httpx.TransportError:
+            ok = False
+            raise
+        except Exception:
+            ok = None  # a local error (e.g. bad request encoding) says nothing about module health
+            raise
+        finally:
+            self.calls += 1
+            self.errors += ok is False
+            self.breaker.record(ok, probe)
+            await self.limiter.release(time.monotonic() - start, ok)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "breaker": self.breaker.snapshot(),
+            "concurrency": self.limiter.snapshot(),
+            "calls": self.calls,
+            "errors": self.errors,
+            "rejected": self.rejected,
+        }
@@ -1,14 +1,16 @@
 from mcp.server.fastmcp import FastMCP
 
 from holded_mcp.client import HoldedClient
-from holded_mcp.tools import contacts, documents, products, treasury, crm, projects, team, accounting
+from holded_mcp.tracing import instrument
+from holded_mcp.tools import contacts, documents, products, treasury, crm, projects, team, accounting, export, diagnostics, batch
 
 mcp = FastMCP("Holded")
 client = HoldedClient()
 
-# Register all tool modules
-for mod in [contacts, documents, products, treasury, crm, projects, team, accounting]:
-    mod.register(mcp, client)
+# Register all tool modules (wrapped with timing spans when tracing is enabled)
+tools_mcp = instrument(mcp, client.tracer)
+for mod in [contacts, documents, products, treasury, crm, projects, team, accounting, export, diagnostics, batch]:
+    mod.register(tools_mcp, client)
 
 
 def main() -> None:
@@ -5,6 +5,7 @@ from typing import Any
 from mcp.server.fastmcp import FastMCP
 
 from holded_mcp.client import HoldedClient
+from holded_mcp.validation import validate_ledger_entry
 
 
 def register(mcp: FastMCP, client: HoldedClient) -> None:
@@ -44,10 +45,12 @@ def register(mcp: FastMCP, client: HoldedClient) -> None:
         - notes (string): Entry note/description
 
         Constraints: Total debits must equal total credits. A single line cannot
-        have both debit and credit values.
+        have both debit and credit values. These constraints and the account numbers
+        are checked locally before anything is sent to Holded.
 
         Returns: {entryGroupId: "<id>"}
         """
+        await validate_ledger_entry(client, data)
         return await client.post("/entry", module="accounting", json=data)
 
     @mcp.tool()
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from typing import Any
+
+from mcp.server.fastmcp import FastMCP
+
+from holded_mcp.client import HoldedClient
+from holded_mcp.lookup import DEFAULT_CONCURRENCY, describe_error, is_empty_id, resolve_ids
+from holded_mcp.validation import check_doc_type
+
+# entity -> (path template, module)
+ENTITIES: dict[str, tuple[str, str]] = {
+    "contact": ("/contacts/{id}", "invoicing"),
+    "product": ("/products/{id}", "invoicing"),
+    "document": ("/documents/{doc_type}/{id}", "invoicing"),
+    "lead": ("/leads/{id}", "crm"),
+    "project": ("/projects/{id}", "projects"),
+    "employee": ("/employees/{id}", "team"),
+}
+
+MAX_IDS = 200
+MAX_CONCURRENCY = 16
+
+
+def register(mcp: FastMCP, client: HoldedClient) -> None:
+
+    @mcp.tool()
+    async def get_many(
+        entity: str, ids: list[str], doc_type: str | None = None, concurrency: int = DEFAULT_CONCURRENCY
+    ) -> Any:
+        """Fetch many records of one kind in a single call, in parallel.
+
+        Use this instead of calling get_contact, get_product, get_document, get_lead,
+        get_project or get_employee once per ID.
+
+        entity: contact, product, document (requires doc_type), lead, project, employee.
+        ids: up to 200 IDs; duplicates are fetched once and empty IDs are reported
+        under errors. Results are served from and stored in the shared response cache.
+        concurrency: maximum requests in flight (1-16, default 8).
+
+        Returns: {results: {<id>: <record>}, errors: {<id>: "<reason>"}}
+        """
+        if entity not in ENTITIES:
+            raise ValueError(f"Unknown entity {entity!r}. Expected one of: {', '.join(ENTITIES)}")
+        if len(ids) > MAX_IDS:
+            raise ValueError(f"At most {MAX_IDS} ids per call (got {len(ids)})")
+        template, module = ENTITIES[entity]
+        if "{doc_type}" in template:
+            if not doc_type:
+                raise ValueError("doc_type is required for entity 'document'")
+            check_doc_type(doc_type)
+
+        fetched = await resolve_ids(
+            client,
+            ids,
+            lambda entity_id: template.format(id=entity_id, doc_type=doc_type),
+            module=module,
+            concurrency=min(max(concurrency, 1), MAX_CONCURRENCY),
+        )
+        errors = {i: "empty ID" for i in ids if is_empty_id(i)}
+        errors.update({i: describe_error(v) for i, v in fetched.items() if isinstance(v, Exception)})
+        return {
+            "results": {i: v for i, v in fetched.items() if not isinstance(v, Exception)},
+            "errors": errors,
+        }
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from typing import Any
+
+from mcp.server.fastmcp import FastMCP
+
+from holded_mcp.client import HoldedClient
+
+
+def register(mcp: FastMCP, client: HoldedClient) -> None:
+
+    @mcp.tool()
+    async def get_client_diagnostics() -> Any:
+        """Report the health of the connection to each Holded API module.
+
+        Does not call Holded. For each module (invoicing, crm, projects, team,
+        accounting) returns:
+        - breaker: {state: "closed" | "open" | "half_open", consecutive_failures,
+          retry_in_s (when open)}
+        - concurrency: {limit (current adaptive limit), in_flight, latency_ewma_ms}
+        - calls, errors (5xx, 429 and transport errors), rejected (failed fast while open)
+        """
+        return await client.diagnostics()
@@ -5,12 +5,73 @@ from typing import Any
 from mcp.server.fastmcp import FastMCP
 
 from holded_mcp.client import HoldedClient
+from holded_mcp.lookup import describe_error, is_empty_id, pick, resolve_ids
+from holded_mcp.validation import validate_document, validate_payment, validate_send
+
+# relation -> fields attached when the caller does not select any
+ENRICH_DEFAULTS: dict[str, list[str]] = {
+    "contact": ["code", "email", "type", "defaults", "billAddress"],
+    "products": ["sku", "barcode", "kind", "tax", "cost"],
+    "treasury": ["name", "type", "accountNumber", "iban"],
+}
+
+
+def _attach(target: dict[str, Any], key: str, obj: Any, fields: list[str]) -> None:
+    if isinstance(obj, Exception):
+        target[key] = {"error": describe_error(obj)}
+    elif obj is not None:
+        target[key] = pick(obj, fields)
+
+
+async def _enrich(client: HoldedClient, docs: list[Any], enrich: dict[str, list[str]]) -> None:
+    """Attach referenced contact, product and treasury fields to documents in place.
+
+    Referenced IDs are collected across the whole batch first, so each unique
+    contact, product or treasury is resolved once per page regardless of row count.
+    """
+    unknown = set(enrich) - set(ENRICH_DEFAULTS)
+    if unknown:
+        raise ValueError(
+            f"Unknown enrich relation(s): {', '.join(sorted(unknown))}. "
+            f"Expected any of: {', '.join(ENRICH_DEFAULTS)}"
+        )
+    docs = [d for d in docs if isinstance(d, dict)]
+    fields = {rel: list(enrich[rel] or ENRICH_DEFAULTS[rel]) for rel in enrich}
+
+    def lines(doc: dict[str, Any], key: str) -> list[dict[str, Any]]:
+        return [line for line in doc.get(key) or [] if isinstance(line, dict)]
+
+    if "contact" in fields:
+        contacts = await resolve_ids(client, (d.get("contact") for d in docs), lambda i: f"/contacts/{i}")
+        for doc in docs:
+            _attach(doc, "contactInfo", contacts.get(str(doc.get("contact") or "")), fields["contact"])
+
+    if "products" in fields:
+        product_ids = (line.get("productId") for d in docs for line in lines(d, "products"))
+        products = await resolve_ids(client, product_ids, lambda i: f"/products/{i}")
+        for doc in docs:
+            for line in lines(doc, "products"):
+                _attach(line, "productInfo", products.get(str(line.get("productId") or "")), fields["products"])
+
+    if "treasury" in fields:
+        # Holded has no single-treasury endpoint; one cached list call serves every lookup.
+        payments = [payment for d in docs for payment in lines(d, "paymentsDetail")]
+        treasuries: dict[str, Any]
+        try:
+            listed = await client.get("/treasury", cached=True)
+        except Exception as exc:
+            # Same shape as resolve_ids: the failure is attached to every row that needed it.
+            treasuries = {str(p["treasury"]): exc for p in payments if not is_empty_id(p.get("treasury"))}
+        else:
+            treasuries = {str(t.get("id")): t for t in listed if isinstance(t, dict)} if isinstance(listed, list) else {}
+        for payment in payments:
+            _attach(payment, "treasuryInfo", treasuries.get(str(payment.get("treasury") or "")), fields["treasury"])
 
 
 def register(mcp: FastMCP, client: HoldedClient) -> None:
 
     @mcp.tool()
-    async def list_documents(doc_type: str, page: int = 1) -> Any:
+    async def list_documents(doc_type: str, page: int = 1, enrich: dict[str, list[str]] | None = None) -> Any:
         """List documents of a given type (paginated).
 
         doc_type must be one of: invoice, salesreceipt, creditnote, estimate, salesorder,
@@ -25,19 +86,37 @@ def register(mcp: FastMCP, client: HoldedClient) -> None:
         Returns an array of document objects with: id, contact, contactName, desc, date,
         dueDate, notes, products, tax, subtotal, discount, total, language, status,
         docNumber, currency, paymentsTotal, paymentsPending.
+
+        Optional enrichment: enrich maps a relation to the fields to attach inline
+        (an empty list selects the defaults). Each referenced record is fetched once
+        per page through a shared cache, however many rows point at it.
+        - contact: adds contactInfo (default: code, email, type, defaults, billAddress)
+        - products: adds productInfo to each product line with a productId
+          (default: sku, barcode, kind, tax, cost)
+        - treasury: adds treasuryInfo to each paymentsDetail entry
+          (default: name, type, accountNumber, iban)
+        Example: {"contact": ["code", "defaults"], "products": ["sku"]}
         """
-        return await client.list_paginated(f"/documents/{doc_type}", page=page)
+        docs = await client.list_paginated(f"/documents/{doc_type}", page=page)
+        if enrich and isinstance(docs, list):
+            await _enrich(client, docs, enrich)
+        return docs
 
     @mcp.tool()
-    async def get_document(doc_type: str, document_id: str) -> Any:
+    async def get_document(doc_type: str, document_id: str, enrich: dict[str, list[str]] | None = None) -> Any:
         """Get a single document by type and ID.
 
         doc_type: invoice, salesreceipt, creditnote, estimate, salesorder, waybill,
         proform, purchase, purchaserefund, purchaseorder.
 
         Returns the full document object including items, totals, payment status, and metadata.
+
+        Optional enrich: same as list_documents, e.g. {"contact": [], "products": ["sku"]}.
         """
-        return await client.get(f"/documents/{doc_type}/{document_id}")
+        doc = await client.get(f"/documents/{doc_type}/{document_id}")
+        if enrich and isinstance(doc, dict):
+            await _enrich(client, [doc], enrich)
+        return doc
 
     @mcp.tool()
     async def create_document(doc_type: str, data: dict[str, Any]) -> Any:
@@ -77,6 +156,7 @@ def register(mcp: FastMCP, client: HoldedClient) -> None:
 
         Returns: {status: 1, id: "<doc_id>", invoiceNum: "F170009", contactId: "<id>"}
         """
+        validate_document(doc_type, data)
         return await client.post(f"/documents/{doc_type}", json=data)
 
     @mcp.tool()
@@ -106,6 +186,7 @@ def register(mcp: FastMCP, client: HoldedClient) -> None:
 
         Returns: {status: 1, invoiceId: "<id>", invoiceNum: "<num>", paymentId: "<id>"}
         """
+        validate_payment(doc_type, data)
         return await client.post(f"/documents/{doc_type}/{document_id}/pay", json=data)
 
     @mcp.tool()
@@ -122,6 +203,7 @@ def register(mcp: FastMCP, client: HoldedClient) -> None:
 
         Returns: {status: 1, info: "Document sent"}
         """
+        validate_send(doc_type, data)
         return await client.post(f"/documents/{doc_type}/{document_id}/send", json=data)
 
     @mcp.tool()
@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import gzip
+import json
+import os
+import secrets
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, TextIO
+
+from mcp.server.fastmcp import FastMCP
+
+from holded_mcp.client import HoldedClient
+from holded_mcp.validation import check_doc_type
+
+# dataset name -> (path template, module)
+DATASETS: dict[str, tuple[str, str]] = {
+    "contacts": ("/contacts", "invoicing"),
+    "products": ("/products", "invoicing"),
+    "documents": ("/documents/{doc_type}", "invoicing"),
+    "ledger": ("/dailyledger", "accounting"),
+    "time_records": ("/projects/{project_id}/times", "projects"),
+}
+
+FORMATS = ("ndjson", "csv", "parquet")
+TIME_FILTERED = ("documents", "ledger")  # datasets whose endpoint accepts starttmp/endtmp
+
+_EXTENSIONS = {"ndjson": "ndjson.gz", "csv": "csv.gz", "parquet": "parquet"}
+_PARQUET_BATCH_ROWS = 10_000
+
+
+def _require_pyarrow() -> tuple[Any, Any]:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError(
+            "Parquet export requires pyarrow. Install it with: pip install 'holded-mcp[parquet]'"
+        ) from exc
+    return pa, pq
+
+
+def _flatten(obj: dict[str, Any], prefix: str = "") -> dict[str, Any]:
+    """Flatten nested objects into dotted column names; lists become JSON strings."""
+    row: dict[str, Any] = {}
+    for key, value in obj.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            row.update(_flatten(value, f"{name}."))
+        elif isinstance(value, list):
+            row[name] = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        else:
+            row[name] = value
+    return row
+
+
+def _split(record: dict[str, Any]) -> tuple[dict[str, Any], dict[str, list[dict[str, Any]]]]:
+    """Split a record into a flat parent row and child tables for top-level lists of objects."""
+    parent: dict[str, Any] = {}
+    children: dict[str, list[dict[str, Any]]] = {}
+    for key, value in record.items():
+        if isinstance(value, list) and value and all(isinstance(v, dict) for v in value):
+            children[key] = value
+        else:
+            parent[key] = value
+    return _flatten(parent), children
+
+
+class _TableWriter:
+    """Streams flat rows to a gzip NDJSON spool, tracking the column set and value types.
+
+    NDJSON output is the spool itself. CSV and Parquet need the full column set up
+    front, so they are produced from the spool in a second streaming pass.
+    """
+
+    def __init__(self, dest: Path, fmt: str) -> None:
+        self.dest = dest
+        self.fmt = fmt
+        self.rows = 0
+        self.columns: dict[str, set[type]] = {}
+        if fmt == "ndjson":
+            self._spool = dest
+        else:
+            fd, spool = tempfile.mkstemp(suffix=".ndjson.gz", dir=dest.parent)
+            os.close(fd)
+            self._spool = Path(spool)
+        self._fh: TextIO = gzip.open(self._spool, "wt", encoding="utf-8")
+
+    def write(self, row: dict[str, Any]) -> None:
+        for key, value in row.items():
+            types = self.columns.setdefault(key, set())
+            if value is not None:
+                types.add(type(value))
+        self._fh.write(json.dumps(row, ensure_ascii=False, separators=(",", ":")))
+        self._fh.write("\n")
+        self.rows += 1
+
+    def _spooled_rows(self):
+        with gzip.open(self._spool, "rt", encoding="utf-8") as fh:
+            for line in fh:
+                yield json.loads(line)
+
+    def finish(self) -> None:
+        self._fh.close()
+        if self.fmt == "ndjson":
+            return
+        try:
+            if self.fmt == "csv":
+                self._write_csv()
+            else:
+                self._write_parquet()
+        finally:
+            self._spool.unlink(missing_ok=True)
+
+    def _write_csv(self) -> None:
+        with gzip.open(self.dest, "wt", encoding="utf-8", newline="") as fh:
+            writer = csv.DictWriter(fh, fieldnames=list(self.columns), restval="")
+            writer.writeheader()
+            for row in self._spooled_rows():
+                writer.writerow(row)
+
+    def _write_parquet(self) -> None:
+        pa, pq = _require_pyarrow()
+
+        def arrow_type(types: set[type]) -> Any:
+            if types and types <= {bool}:
+                return pa.bool_()
+            if types and types <= {int}:
+                return pa.int64()
+            if types and types <= {int, float}:
+                return pa.float64()
+            return pa.string()
+
+        schema = pa.schema([(name, arrow_type(types)) for name, types in self.columns.items()])
+        as_text = {f.name for f in schema if pa.types.is_string(f.type)}
+
+        def coerce(row: dict[str, Any]) -> dict[str, Any]:
+            for key in as_text.intersection(row):
+                if row[key] is not None and not isinstance(row[key], str):
+                    row[key] = json.dumps(row[key])
+            return row
+
+        with pq.ParquetWriter(self.dest, schema, compression="zstd") as writer:
+            batch: list[dict[str, Any]] = []
+            for row in self._spooled_rows():
+                batch.append(coerce(row))
+                if len(batch) >= _PARQUET_BATCH_ROWS:
+                    writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                    batch.clear()
+            if batch or self.rows == 0:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+
+    def discard(self) -> None:
+        self._fh.close()
+        self._spool.unlink(missing_ok=True)
+        self.dest.unlink(missing_ok=True)
+
+
+def register(mcp: FastMCP, client: HoldedClient) -> None:
+
+    @mcp.tool()
+    async def export_dataset(
+        dataset: str,
+        format: str = "ndjson",
+        doc_type: str | None = None,
+        project_id: str | None = None,
+        starttmp: int | None = None,
+        endtmp: int | None = None,
+        output_dir: str | None = None,
+    ) -> Any:
+        """Stream a full dataset to a compressed file on local disk (for BI hand-off).
+
+        Pages are fetched one at a time and written straight to disk, so memory use
+        stays constant and no rows are returned into the conversation.
+
+        dataset: contacts, products, documents (requires doc_type), ledger,
+        time_records (requires project_id).
+        format: ndjson (gzip), csv (gzip) or parquet (requires pyarrow).
+
+        Optional filters (documents and ledger only; rejected for other datasets):
+        - starttmp/endtmp: Unix timestamp range
+
+        Nested objects (e.g. billAddress) are flattened into dotted columns such as
+        "billAddress.city". Top-level arrays of objects (e.g. document products,
+        contactPersons) are written to child tables keyed by "_parent_id" and "_line".
+
+        Files are written to output_dir, HOLDED_EXPORT_DIR, or a "holded-exports"
+        directory under the system temp dir.
+
+        Returns: {path, format, rows, child_tables: {<name>: {path, rows}}}
+        """
+        if dataset not in DATASETS:
+            raise ValueError(f"Unknown dataset {dataset!r}. Expected one of: {', '.join(DATASETS)}")
+        if format not in FORMATS:
+            raise ValueError(f"Unknown format {format!r}. Expected one of: {', '.join(FORMATS)}")
+        if format == "parquet":
+            _require_pyarrow()  # fail before downloading anything, not after spooling every page
+        template, module = DATASETS[dataset]
+        if "{doc_type}" in template and not doc_type:
+            raise ValueError("doc_type is required for the documents dataset")
+        if doc_type is not None:
+            check_doc_type(doc_type)
+        if "{project_id}" in template and not project_id:
+            raise ValueError("project_id is required for the time_records dataset")
+        path = template.format(doc_type=doc_type, project_id=project_id)
+
+        params: dict[str, Any] = {}
+        if (starttmp is not None or endtmp is not None) and dataset not in TIME_FILTERED:
+            raise ValueError(f"starttmp/endtmp only apply to: {', '.join(TIME_FILTERED)}")
+        if starttmp is not None:
+            params["starttmp"] = starttmp
+        if endtmp is not None:
+            params["endtmp"] = endtmp
+
+        directory = Path(
+            output_dir or os.environ.get("HOLDED_EXPORT_DIR") or Path(tempfile.gettempdir()) / "holded-exports"
+        )
+        directory.mkdir(parents=True, exist_ok=True)
+        stem = "-".join(filter(None, [
+            dataset, doc_type, project_id, time.strftime("%Y%m%d-%H%M%S"), secrets.token_hex(3),
+        ]))
+        ext = _EXTENSIONS[format]
+
+        main = _TableWriter(directory / f"{stem}.{ext}", format)
+        children: dict[str, _TableWriter] = {}
+
+        def write_page(rows: list[Any]) -> None:
+            for record in rows:
+                if not isinstance(record, dict):
+                    continue
+                row, nested = _split(record)
+                main.write(row)
+                for name, items in nested.items():
+                    child = children.get(name)
+                    if child is None:
+                        child = children[name] = _TableWriter(directory / f"{stem}.{name}.{ext}", format)
+                    for line, item in enumerate(items):
+                        child.write({"_parent_id": record.get("id"), "_line": line, **_flatten(item)})
+
+        try:
+            async for rows in client.iter_pages(path, module=module, params=params):
+                # Flattening, JSON encoding and gzip run off the event loop, one page at a time.
+                await asyncio.to_thread(write_page, rows)
+            for writer in [main, *children.values()]:
+                await asyncio.to_thread(writer.finish)
+        except BaseException:
+            for writer in [main, *children.values()]:
+                writer.discard()
+            raise
+
+        return {
+            "path": str(main.dest),
+            "format": format,
+            "rows": main.rows,
+            "child_tables": {
+                name: {"path": str(child.dest), "rows": child.rows} for name, child in children.items()
+            },
+        }
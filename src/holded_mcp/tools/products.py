@@ -1,13 +1,19 @@
 from __future__ import annotations
 
+import os
 from typing import Any
 
 from mcp.server.fastmcp import FastMCP
 
 from holded_mcp.client import HoldedClient
+from holded_mcp.writebuffer import DEFAULT_STOCK_WINDOW, StockWriteBuffer
 
 
 def register(mcp: FastMCP, client: HoldedClient) -> None:
+    window_ms = os.environ.get("HOLDED_STOCK_COALESCE_MS")
+    stock_buffer = StockWriteBuffer(
+        client, float(window_ms) / 1000 if window_ms is not None else DEFAULT_STOCK_WINDOW
+    )
 
     @mcp.tool()
     async def list_products(page: int = 1) -> Any:
@@ -76,6 +82,19 @@ def register(mcp: FastMCP, client: HoldedClient) -> None:
 
         This allows setting stock for multiple warehouses and product variants in a single call.
 
+        Concurrent updates for the same product arriving within a short window
+        (HOLDED_STOCK_COALESCE_MS, default 50) are merged into a single request as long
+        as they touch different warehouse/variant pairs; order is always preserved.
+
         Returns: {status: 1, info: "Updated", id: "<product_id>"}
         """
-        return await client.put(f"/products/{product_id}/stock", json=data)
+        return await stock_buffer.submit(product_id, data)
+
+    @mcp.tool()
+    async def flush_stock_updates(product_id: str | None = None) -> Any:
+        """Immediately send any buffered stock updates (for one product, or all) and wait for them.
+
+        Returns: {flushed_products, window_ms, pending_products, updates_received, requests_sent}
+        """
+        flushed = await stock_buffer.flush(product_id)
+        return {"flushed_products": flushed, **stock_buffer.stats()}
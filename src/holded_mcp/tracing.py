@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import atexit
+import contextvars
+import functools
+import json
+import logging
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, TextIO
+
+import httpx
+
+logger = logging.getLogger("holded_mcp")
+
+DEFAULT_PROFILE_INTERVAL_MS = 5.0
+PROFILE_TOP_N = 15
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str
+    trace_id: str
+    span_id: str
+    parent: Span | None
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int = 0
+    attributes: dict[str, Any] = field(default_factory=dict)
+    # phase name -> seconds; tool spans accumulate the phases of their HTTP children,
+    # so with concurrent requests these are cumulative and may exceed wall time
+    phases: Counter[str] = field(default_factory=Counter)
+    # (start_ns, end_ns) of the HTTP requests made under this span
+    http_intervals: list[tuple[int, int]] = field(default_factory=list)
+    marks: dict[str, float] = field(default_factory=dict)
+    error: str | None = None
+
+    def mark(self, name: str) -> None:
+        self.marks[name] = time.perf_counter()
+
+    def http_wall(self) -> float:
+        """Seconds during which at least one HTTP request was in flight (overlaps counted once)."""
+        total, reach = 0, 0
+        for start, end in sorted(self.http_intervals):
+            if end > reach:
+                total += end - max(start, reach)
+                reach = end
+        return total / 1e9
+
+    def to_otlp(self) -> dict[str, Any]:
+        """Encode as an OTLP/JSON span (one span per line; no resource wrapper)."""
+        attributes = {**self.attributes, **{f"phase.{k}_ms": round(v * 1000, 3) for k, v in self.phases.items()}}
+        if self.kind != "SPAN_KIND_CLIENT" and self.http_intervals:
+            attributes["http.wall_ms"] = round(self.http_wall() * 1000, 3)
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent.span_id if self.parent else "",
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items()],
+            "status": {"code": "STATUS_CODE_ERROR", "message": self.error} if self.error else {"code": "STATUS_CODE_OK"},
+        }
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+_current: contextvars.ContextVar[Span | None] = contextvars.ContextVar("holded_span", default=None)
+
+
+class Tracer:
+    """Opt-in tracing of tool calls and the HTTP requests they make.
+
+    Configured from the environment:
+    - HOLDED_TRACE_FILE: append finished spans as OTLP/JSON lines to this file
+    - HOLDED_SLOW_CALL_MS: log tool calls slower than this with a phase breakdown
+    - HOLDED_PROFILE: "1" to run a sampling profiler and dump the hottest functions
+      per tool at exit (to HOLDED_PROFILE_FILE, or the log)
+
+    With none of these set, ``enabled`` is false and nothing is instrumented.
+    """
+
+    def __init__(
+        self,
+        trace_file: str | None = None,
+        slow_call_ms: float | None = None,
+        profile: bool = False,
+        profile_file: str | None = None,
+    ) -> None:
+        self.slow_call_s = slow_call_ms / 1000 if slow_call_ms is not None else None
+        self._out: TextIO | None = open(trace_file, "a", buffering=1, encoding="utf-8") if trace_file else None
+        self.profiler = SamplingProfiler(profile_file) if profile else None
+        self.enabled = self._out is not None or self.slow_call_s is not None or self.profiler is not None
+
+    @classmethod
+    def from_env(cls) -> Tracer:
+        slow = os.environ.get("HOLDED_SLOW_CALL_MS")
+        return cls(
+            trace_file=os.environ.get("HOLDED_TRACE_FILE") or None,
+            slow_call_ms=float(slow) if slow else None,
+            profile=os.environ.get("HOLDED_PROFILE", "").strip().lower() in ("1", "true", "yes"),
+            profile_file=os.environ.get("HOLDED_PROFILE_FILE") or None,
+        )
+
+    @contextmanager
+    def span(self, name: str, kind: str = "SPAN_KIND_INTERNAL", **attributes: Any) -> Iterator[Span | None]:
+        if not self.enabled:
+            yield None
+            return
+        parent = _current.get()
+        span = Span(
+            name=name,
+            kind=kind,
+            trace_id=parent.trace_id if parent else secrets.token_hex(16),
+            span_id=secrets.token_hex(8),
+            parent=parent,
+            attributes=attributes,
+        )
+        token = _current.set(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException as exc:
+            span.error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            _current.reset(token)
+            span.end_ns = time.time_ns()
+            duration = time.perf_counter() - start
+            if kind == "SPAN_KIND_CLIENT":
+                span.http_intervals.append((span.start_ns, span.end_ns))
+            if parent is not None:
+                parent.phases.update(span.phases)
+                parent.http_intervals.extend(span.http_intervals)
+                parent.attributes["http.calls"] = parent.attributes.get("http.calls", 0) + (kind == "SPAN_KIND_CLIENT")
+            self._finish(span, duration)
+
+    def _finish(self, span: Span, duration: float) -> None:
+        if self._out is not None:
+            self._out.write(json.dumps(span.to_otlp(), separators=(",", ":")) + "\n")
+        if span.parent is None and self.slow_call_s is not None and duration >= self.slow_call_s:
+            http_wall = span.http_wall()
+            serialize = span.phases.get("serialize", 0.0)
+            breakdown = ", ".join(f"{k}={v * 1000:.1f}ms" for k, v in span.phases.most_common() if k != "serialize")
+            logger.warning(
+                "slow call %s: %.1fms (%d HTTP calls, %.1fms with a request in flight; "
+                "cumulative HTTP phases: %s; serialize=%.1fms; other=%.1fms)",
+                span.name, duration * 1000, span.attributes.get("http.calls", 0), http_wall * 1000,
+                breakdown or "none", serialize * 1000, max(0.0, duration - http_wall - serialize) * 1000,
+            )
+
+    # -- httpx integration ------------------------------------------------------
+
+    def event_hooks(self) -> dict[str, list[Callable[..., Any]]]:
+        """httpx event hooks that time the connection, server and transfer phases."""
+
+        async def on_request(request: httpx.Request) -> None:
+            span = _current.get()
+            if span is None or span.kind != "SPAN_KIND_CLIENT":
+                return
+            record_phase(span, "queue", "queued")  # waiting for the module's concurrency limiter
+            started: dict[str, float] = {}
+
+            async def trace(event: str, info: dict[str, Any]) -> None:
+                # httpcore events look like "connection.connect_tcp.started" / ".complete"
+                step, _, state = event.rpartition(".")
+                phase = _PHASES.get(step.rpartition(".")[2])
+                if phase is None:
+                    return
+                now = time.perf_counter()
+                if state == "started":
+                    started[step] = now
+                elif step in started:
+                    span.phases[phase] += now - started.pop(step)
+
+            request.extensions = {**request.extensions, "trace": trace}
+
+        async def on_response(response: httpx.Response) -> None:
+            span = _current.get()
+            if span is not None and span.kind == "SPAN_KIND_CLIENT":
+                span.attributes["http.status_code"] = response.status_code
+
+        return {"request": [on_request], "response": [on_response]}
+
+    @contextmanager
+    def http_span(self, method: str, url: str) -> Iterator[Span | None]:
+        with self.span(f"HTTP {method}", "SPAN_KIND_CLIENT", **{"http.method": method, "http.url": url}) as span:
+            if span is not None:
+                span.mark("queued")
+            yield span
+
+    # -- tool instrumentation ---------------------------------------------------
+
+    def wrap_tool(self, fn: Callable[..., Any]) -> Callable[..., Any]:
+        """Mark when the tool function returns, so serialization can be told apart from it."""
+        if self.profiler is not None:
+            self.profiler.tools[fn.__code__] = fn.__name__
+
+        @functools.wraps(fn)
+        async def traced(*args: Any, **kwargs: Any) -> Any:
+            result = await fn(*args, **kwargs)
+            span = _current.get()
+            if span is not None:
+                span.mark("returned")
+            return result
+
+        return traced
+
+    def wrap_call_tool(self, call_tool: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap FastMCP's ``ToolManager.call_tool`` with the tool span.
+
+        The span covers argument validation, the tool itself and FastMCP's conversion
+        of the result to MCP content, which is recorded as the ``serialize`` phase.
+        """
+
+        @functools.wraps(call_tool)
+        async def traced(name: str, arguments: dict[str, Any], *args: Any, **kwargs: Any) -> Any:
+            with self.span(f"tool/{name}", **{"mcp.tool": name}) as span:
+                result = await call_tool(name, arguments, *args, **kwargs)
+                record_phase(span, "serialize", "returned")
+                return result
+
+        return traced
+
+
+# httpcore trace step -> phase name reported in spans and the slow-call log
+_PHASES = {
+    "connect_tcp": "dns_connect",
+    "start_tls": "tls",
+    "send_request_headers": "send",
+    "send_request_body": "send",
+    "receive_response_headers": "server",
+    "receive_response_body": "download",
+}
+
+
+def record_phase(span: Span | None, phase: str, since_mark: str) -> None:
+    """Add the time elapsed since ``since_mark`` to ``phase`` of ``span`` (if tracing)."""
+    if span is not None and since_mark in span.marks:
+        span.phases[phase] += time.perf_counter() - span.marks[since_mark]
+
+
+class _InstrumentedMCP:
+    """Proxy handed to ``register(mcp, client)`` that marks when every tool returns."""
+
+    def __init__(self, mcp: Any, tracer: Tracer) -> None:
+        self._mcp = mcp
+        self._tracer = tracer
+
+    def tool(self, *args: Any, **kwargs: Any) -> Callable[[Callable[..., Any]], Any]:
+        decorator = self._mcp.tool(*args, **kwargs)
+        return lambda fn: decorator(self._tracer.wrap_tool(fn))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._mcp, name)
+
+
+def instrument(mcp: Any, tracer: Tracer) -> Any:
+    """Return ``mcp`` itself when tracing is off, or a proxy that times every tool."""
+    if not tracer.enabled:
+        return mcp
+    manager = mcp._tool_manager
+    manager.call_tool = tracer.wrap_call_tool(manager.call_tool)
+    if tracer.profiler is not None:
+        tracer.profiler.start()
+    return _InstrumentedMCP(mcp, tracer)
+
+
+class SamplingProfiler:
+    """Samples the event-loop thread's stack and attributes the leaf frame to the tool on the stack.
+
+    Only frames actually executing are seen, so the counts reflect CPU time spent in
+    a tool (JSON handling, validation, flattening...), not time awaiting Holded.
+    """
+
+    def __init__(self, output: str | None = None, interval_ms: float | None = None) -> None:
+        interval = interval_ms or float(os.environ.get("HOLDED_PROFILE_INTERVAL_MS", DEFAULT_PROFILE_INTERVAL_MS))
+        self.interval = interval / 1000
+        self.output = output
+        self.tools: dict[Any, str] = {}
+        self.samples: dict[str, Counter[str]] = {}
+        self._thread_id = threading.main_thread().ident
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="holded-profiler", daemon=True)
+        self._thread.start()
+        atexit.register(self.dump)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            leaf = frame
+            while frame is not None:
+                tool = self.tools.get(frame.f_code)
+                if tool is not None:
+                    code = leaf.f_code
+                    where = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                    self.samples.setdefault(tool, Counter())[where] += 1
+                    break
+                frame = frame.f_back
+
+    def report(self, top: int = PROFILE_TOP_N) -> dict[str, list[tuple[str, float]]]:
+        """Per tool, the ``top`` hottest functions with their share of the tool's samples."""
+        result = {}
+        for tool, counts in self.samples.items():
+            total = sum(counts.values())
+            result[tool] = [(fn, round(100 * n / total, 1)) for fn, n in counts.most_common(top)]
+        return result
+
+    def dump(self) -> None:
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()  # the sampler must not update ``samples`` while we read them
+        report = self.report()
+        if not report:
+            return
+        if self.output:
+            with open(self.output, "w", encoding="utf-8") as fh:
+                json.dump(report, fh, indent=2)
+        else:
+            for tool, hot in report.items():
+                logger.warning("profile %s: %s", tool, ", ".join(f"{fn} {pct}%" for fn, pct in hot))
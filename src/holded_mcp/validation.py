@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+from holded_mcp.client import HoldedClient
+
+DOC_TYPES = (
+    "invoice", "salesreceipt", "creditnote", "estimate", "salesorder",
+    "waybill", "proform", "purchase", "purchaserefund", "purchaseorder",
+)
+
+CHART_TTL = 300.0  # seconds the chart of accounts is trusted for account-number checks
+
+
+class ValidationError(ValueError):
+    """A payload was rejected locally, before any request was sent to Holded."""
+
+    def __init__(self, errors: list[str]) -> None:
+        self.errors = errors
+        super().__init__("Invalid payload: " + "; ".join(errors))
+
+
+@dataclass(frozen=True)
+class Field:
+    kind: str  # int, number, str, bool, list, dict
+    required: bool = False
+    min_length: int | None = None
+    items: dict[str, Field] | None = None  # schema for list elements that are objects
+
+
+_KINDS: dict[str, Callable[[Any], bool]] = {
+    "int": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "str": lambda v: isinstance(v, str),
+    "bool": lambda v: isinstance(v, bool),
+    "list": lambda v: isinstance(v, list),
+    "dict": lambda v: isinstance(v, dict),
+}
+
+Checker = Callable[[Any, str, list[str]], None]
+
+
+def compile_schema(schema: dict[str, Field]) -> Checker:
+    """Compile a schema into one closure per field, so validating is a flat loop of calls."""
+    checks: list[Checker] = []
+    for name, spec in schema.items():
+        checks.append(_compile_field(name, spec))
+
+    def check(obj: Any, where: str, errors: list[str]) -> None:
+        if not isinstance(obj, dict):
+            errors.append(f"{where or 'payload'}: expected an object")
+            return
+        for field_check in checks:
+            field_check(obj, where, errors)
+
+    return check
+
+
+def _compile_field(name: str, spec: Field) -> Checker:
+    is_kind = _KINDS[spec.kind]
+    item_check = compile_schema(spec.items) if spec.items is not None else None
+
+    def check(obj: dict[str, Any], where: str, errors: list[str]) -> None:
+        path = f"{where}.{name}" if where else name
+        if name not in obj or obj[name] is None:
+            if spec.required:
+                errors.append(f"{path}: required")
+            return
+        value = obj[name]
+        if not is_kind(value):
+            errors.append(f"{path}: expected {spec.kind}, got {type(value).__name__}")
+            return
+        if spec.min_length is not None and len(value) < spec.min_length:
+            unit = "characters" if spec.kind == "str" else "items"
+            errors.append(f"{path}: must have at least {spec.min_length} {unit}")
+        if item_check is not None:
+            for i, item in enumerate(value):
+                item_check(item, f"{path}[{i}]", errors)
+
+    return check
+
+
+_check_ledger_entry = compile_schema({
+    "date": Field("int", required=True),
+    "lines": Field("list", required=True, min_length=2, items={
+        "account": Field("int", required=True),
+        "debit": Field("number"),
+        "credit": Field("number"),
+        "description": Field("str"),
+        "tags": Field("list"),
+    }),
+    "notes": Field("str"),
+})
+
+_check_document = compile_schema({
+    "contactId": Field("str"),
+    "contactName": Field("str"),
+    "contactEmail": Field("str"),
+    "date": Field("int", required=True),
+    "dueDate": Field("int"),
+    "items": Field("list", items={
+        "name": Field("str"),
+        "desc": Field("str"),
+        "units": Field("number"),
+        "subtotal": Field("number"),
+        "discount": Field("number"),
+        "tax": Field("number"),
+        "sku": Field("str"),
+        "serviceId": Field("str"),
+    }),
+    "desc": Field("str"),
+    "notes": Field("str"),
+    "currency": Field("str"),
+    "currencyChange": Field("number"),
+    "language": Field("str"),
+    "paymentMethodId": Field("str"),
+    "numSerieId": Field("str"),
+    "invoiceNum": Field("str"),
+    "tags": Field("list"),
+    "salesChannelId": Field("str"),
+    "applyContactDefaults": Field("bool"),
+})
+
+_check_payment = compile_schema({
+    "date": Field("int", required=True),
+    "amount": Field("number", required=True),
+    "treasury": Field("str"),
+    "desc": Field("str"),
+})
+
+_check_send = compile_schema({
+    "emails": Field("str", required=True),
+    "subject": Field("str", min_length=10),
+    "message": Field("str", min_length=20),
+    "mailTemplateId": Field("str"),
+})
+
+
+def _raise_if(errors: list[str]) -> None:
+    if errors:
+        raise ValidationError(errors)
+
+
+def check_doc_type(doc_type: str, errors: list[str] | None = None) -> None:
+    if doc_type not in DOC_TYPES:
+        msg = f"doc_type: unknown {doc_type!r}, expected one of: {', '.join(DOC_TYPES)}"
+        if errors is None:
+            raise ValidationError([msg])
+        errors.append(msg)
+
+
+def validate_document(doc_type: str, data: Any) -> None:
+    errors: list[str] = []
+    check_doc_type(doc_type, errors)
+    _check_document(data, "", errors)
+    _raise_if(errors)
+
+
+def validate_payment(doc_type: str, data: Any) -> None:
+    errors: list[str] = []
+    check_doc_type(doc_type, errors)
+    _check_payment(data, "", errors)
+    if not errors and data["amount"] <= 0:
+        errors.append("amount: must be greater than 0")
+    _raise_if(errors)
+
+
+def validate_send(doc_type: str, data: Any) -> None:
+    errors: list[str] = []
+    check_doc_type(doc_type, errors)
+    _check_send(data, "", errors)
+    if not errors:
+        for email in data["emails"].split(","):
+            if "@" not in email.strip():
+                errors.append(f"emails: {email.strip()!r} is not an email address")
+    _raise_if(errors)
+
+
+async def validate_ledger_entry(client: HoldedClient, data: Any) -> None:
+    """Check structure and balance locally, then account numbers against the cached chart.
+
+    The chart of accounts is fetched at most once per CHART_TTL, plus once more
+    when a line's account is missing from the cached copy (it may have just been
+    created in Holded). If it cannot be fetched (e.g. GET is not allowed), the
+    account-number check is skipped and Holded remains the authority.
+    """
+    errors: list[str] = []
+    _check_ledger_entry(data, "", errors)
+    _raise_if(errors)
+
+    debit_cents = credit_cents = 0
+    for i, line in enumerate(data["lines"]):
+        debit, credit = line.get("debit") or 0, line.get("credit") or 0
+        if debit and credit:
+            errors.append(f"lines[{i}]: cannot have both debit and credit")
+        elif not debit and not credit:
+            errors.append(f"lines[{i}]: needs a debit or a credit amount")
+        if debit < 0 or credit < 0:
+            errors.append(f"lines[{i}]: amounts must not be negative")
+        debit_cents += round(debit * 100)
+        credit_cents += round(credit * 100)
+    if debit_cents != credit_cents:
+        errors.append(f"lines: debits ({debit_cents / 100:.2f}) do not equal credits ({credit_cents / 100:.2f})")
+    _raise_if(errors)
+
+    unknown = await _unknown_accounts(client, data["lines"], refresh=False)
+    if unknown:
+        # The cached chart may predate accounts just created in Holded: check once more against a fresh copy.
+        unknown = await _unknown_accounts(client, data["lines"], refresh=True)
+    for i in unknown:
+        account = data["lines"][i]["account"]
+        errors.append(f"lines[{i}].account: {account} is not in the chart of accounts")
+    _raise_if(errors)
+
+
+async def _unknown_accounts(client: HoldedClient, lines: list[dict[str, Any]], *, refresh: bool) -> list[int]:
+    """Indexes of lines whose account is not in the chart; none if the chart cannot be fetched."""
+    try:
+        chart = await client.get_compact(
+            "/chartofaccounts", module="accounting", params={"includeEmpty": 1}, ttl=CHART_TTL, refresh=refresh
+        )
+    except (httpx.HTTPError, PermissionError, RuntimeError):
+        return []
+    known = chart.distinct("accountNumber")  # computed once per cached chart
+    if not known:
+        return []
+    return [i for i, line in enumerate(lines) if line["account"] not in known and str(line["account"]) not in known]
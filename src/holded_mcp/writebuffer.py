@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+
+from holded_mcp.client import HoldedClient
+from holded_mcp.resilience import is_failure
+
+DEFAULT_STOCK_WINDOW = 0.05  # seconds
+
+
+@dataclass
+class _Batch:
+    data: dict[str, Any]
+    mergeable: bool
+    # each caller's own payload and the future it awaits
+    updates: list[tuple[dict[str, Any], asyncio.Future[Any]]] = field(default_factory=list)
+
+    def accepts(self, stock: dict[str, dict[str, Any]]) -> bool:
+        """A batch accepts stock that touches no (warehouse, variant) pair it already holds."""
+        if not self.mergeable:
+            return False
+        held = self.data["stock"]
+        return not any(variant in held.get(wh, {}) for wh, variants in stock.items() for variant in variants)
+
+    def merge(self, stock: dict[str, dict[str, Any]]) -> None:
+        held = self.data["stock"]
+        for wh, variants in stock.items():
+            held.setdefault(wh, {}).update(variants)
+
+
+def _stock_map(data: Any) -> dict[str, dict[str, Any]] | None:
+    """Return ``data["stock"]`` if ``data`` is a plain, mergeable stock payload."""
+    if not isinstance(data, dict) or set(data) != {"stock"} or not isinstance(data["stock"], dict):
+        return None
+    stock = data["stock"]
+    if not all(isinstance(v, dict) for v in stock.values()):
+        return None
+    return stock
+
+
+class StockWriteBuffer:
+    """Coalesces ``PUT /products/{id}/stock`` calls for the same product.
+
+    Updates arriving within ``window`` seconds are merged into one
+    ``{"stock": {warehouse: {variant: qty}}}`` payload as long as they touch
+    different (warehouse, variant) pairs. An update for a pair already in the
+    pending batch starts a new batch instead, so the API sees every value in
+    submission order and the merge never changes semantics (absolute or delta).
+    Batches for a product are sent strictly in order; each caller awaits the
+    response of the PUT that carried its update. If Holded rejects a merged PUT
+    with a client error (4xx other than 429), each update is re-sent on its own
+    so only the callers whose payload is invalid see the error.
+    """
+
+    def __init__(self, client: HoldedClient, window: float = DEFAULT_STOCK_WINDOW) -> None:
+        self.client = client
+        self.window = window
+        self._queues: dict[str, list[_Batch]] = {}
+        self._drains: dict[str, asyncio.Task[None]] = {}
+        self._wake: dict[str, asyncio.Event] = {}
+        self.requests_sent = 0
+        self.updates_received = 0
+
+    async def submit(self, product_id: str, data: dict[str, Any]) -> Any:
+        self.updates_received += 1
+        if self.window <= 0:
+            return await self._put(product_id, data)
+
+        stock = _stock_map(data)
+        queue = self._queues.setdefault(product_id, [])
+        if stock is not None and queue and queue[-1].accepts(stock):
+            batch = queue[-1]
+            batch.merge(stock)
+        else:
+            batch = _Batch(
+                data={"stock": {wh: dict(v) for wh, v in stock.items()}} if stock is not None else data,
+                mergeable=stock is not None,
+            )
+            queue.append(batch)
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        batch.updates.append((data, future))
+        if product_id not in self._drains:
+            self._wake[product_id] = asyncio.Event()
+            self._drains[product_id] = asyncio.create_task(self._drain(product_id))
+        return await asyncio.shield(future)
+
+    async def _drain(self, product_id: str) -> None:
+        try:
+            try:
+                await asyncio.wait_for(self._wake[product_id].wait(), self.window)
+            except asyncio.TimeoutError:
+                pass
+            queue = self._queues[product_id]
+            while queue:
+                batch = queue[0]
+                batch.mergeable = False  # in flight: later updates go to a new batch
+                try:
+                    result = await self._put(product_id, batch.data)
+                except httpx.HTTPStatusError as exc:
+                    if len(batch.updates) > 1 and not is_failure(exc.response):
+                        await self._send_each(product_id, batch)
+                    else:
+                        _resolve(batch, exc=exc)
+                except Exception as exc:
+                    _resolve(batch, exc=exc)
+                else:
+                    _resolve(batch, result=result)
+                queue.pop(0)
+        finally:
+            # Cancelled (e.g. at shutdown) or failed unexpectedly: nobody may wait forever.
+            for batch in self._queues.pop(product_id):
+                _resolve(batch, exc=RuntimeError(f"stock update for product {product_id} was interrupted"))
+            del self._drains[product_id], self._wake[product_id]
+
+    async def _put(self, product_id: str, data: dict[str, Any]) -> Any:
+        self.requests_sent += 1
+        return await self.client.put(f"/products/{product_id}/stock", json=data)
+
+    async def _send_each(self, product_id: str, batch: _Batch) -> None:
+        """Re-send the updates of a rejected merged batch one by one, in submission order."""
+        for data, future in batch.updates:
+            try:
+                result = await self._put(product_id, data)
+            except Exception as exc:
+                _set(future, exc=exc)
+            else:
+                _set(future, result=result)
+
+    async def flush(self, product_id: str | None = None) -> int:
+        """Send pending updates now (for one product or all) and wait until they are done.
+
+        Returns the number of products flushed.
+        """
+        products = [product_id] if product_id is not None else list(self._drains)
+        tasks = []
+        for pid in products:
+            if pid in self._drains:
+                self._wake[pid].set()
+                tasks.append(self._drains[pid])
+        await asyncio.gather(*tasks)
+        return len(tasks)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "window_ms": round(self.window * 1000),
+            "pending_products": len(self._queues),
+            "updates_received": self.updates_received,
+            "requests_sent": self.requests_sent,
+        }
+
+
+def _resolve(batch: _Batch, *, result: Any = None, exc: BaseException | None = None) -> None:
+    for _, future in batch.updates:
+        _set(future, result=result, exc=exc)
+
+
+def _set(future: asyncio.Future[Any], *, result: Any = None, exc: BaseException | None = None) -> None:
+    if future.done():
+        return
+    if exc is None:
+        future.set_result(result)
+    else:
+        future.set_exception(exc)
+        future.exception()  # don't warn if the caller went away
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import httpx
+import pytest
+
+from holded_mcp.client import HoldedClient
+
+ClientFactory = Callable[..., HoldedClient]
+
+
+@pytest.fixture
+def make_client(monkeypatch: pytest.MonkeyPatch) -> ClientFactory:
+    """Build a HoldedClient whose requests are answered by ``handler`` instead of Holded.
+
+    The environment is cleared of cache and tracing settings so tests never
+    touch a developer's real cache file; pass ``cache_path`` to enable the disk tier.
+    """
+    for name in ("HOLDED_API_KEY", "HOLDED_ALLOWED_METHODS", "HOLDED_CACHE_PATH", "HOLDED_CACHE_MAX_BYTES",
+                 "HOLDED_TRACE_FILE", "HOLDED_SLOW_CALL_MS", "HOLDED_PROFILE"):
+        monkeypatch.delenv(name, raising=False)
+
+    def factory(
+        handler: Callable[[httpx.Request], Any] | None = None,
+        *,
+        cache_path: str | Path | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> HoldedClient:
+        if cache_path is not None:
+            monkeypatch.setenv("HOLDED_CACHE_PATH", str(cache_path))
+        client = HoldedClient(api_key="test", allowed_methods="ALL")
+        if handler is not None or transport is not None:
+            client._client = httpx.AsyncClient(transport=transport or httpx.MockTransport(handler))
+        return client
+
+    return factory
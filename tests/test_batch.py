@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import Callable
+
+import httpx
+import pytest
+from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp.exceptions import ToolError
+
+from holded_mcp.client import HoldedClient
+from holded_mcp.tools.batch import MAX_IDS, register
+
+ClientFactory = Callable[..., HoldedClient]
+
+
+def get_many(client: HoldedClient, **arguments: object) -> dict:
+    mcp = FastMCP("test")
+    register(mcp, client)
+    result = asyncio.run(mcp.call_tool("get_many", arguments))
+    content = result[0] if isinstance(result, tuple) else result
+    return json.loads(content[0].text)
+
+
+def records(missing: set[str] = frozenset()) -> tuple[list[str], Callable]:
+    paths: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        paths.append(request.url.path)
+        entity_id = request.url.path.rsplit("/", 1)[1]
+        if entity_id in missing:
+            return httpx.Response(404, json={"error": "not found"})
+        return httpx.Response(200, json={"id": entity_id})
+
+    return paths, handler
+
+
+def test_duplicates_are_fetched_once(make_client: ClientFactory) -> None:
+    paths, handler = records()
+    out = get_many(make_client(handler), entity="contact", ids=["a", "b", "a", "a", "b"])
+    assert out == {"results": {"a": {"id": "a"}, "b": {"id": "b"}}, "errors": {}}
+    assert sorted(paths) == ["/api/invoicing/v1/contacts/a", "/api/invoicing/v1/contacts/b"]
+
+
+def test_errors_are_reported_per_id(make_client: ClientFactory) -> None:
+    _, handler = records(missing={"gone"})
+    out = get_many(make_client(handler), entity="product", ids=["ok", "gone", "", "  "])
+    assert out["results"] == {"ok": {"id": "ok"}}
+    assert out["errors"] == {"gone": "HTTP 404", "": "empty ID", "  ": "empty ID"}
+
+
+def test_documents_require_a_valid_doc_type(make_client: ClientFactory) -> None:
+    paths, handler = records()
+    client = make_client(handler)
+    with pytest.raises(ToolError, match="doc_type is required"):
+        get_many(client, entity="document", ids=["d1"])
+    with pytest.raises(ToolError, match="unknown 'bill'"):
+        get_many(client, entity="document", ids=["d1"], doc_type="bill")
+    assert get_many(client, entity="document", ids=["d1"], doc_type="invoice")["results"] == {"d1": {"id": "d1"}}
+    assert paths == ["/api/invoicing/v1/documents/invoice/d1"]
+
+
+def test_rejects_more_than_max_ids(make_client: ClientFactory) -> None:
+    paths, handler = records()
+    with pytest.raises(ToolError, match=f"At most {MAX_IDS} ids"):
+        get_many(make_client(handler), entity="contact", ids=[str(i) for i in range(MAX_IDS + 1)])
+    assert paths == []
+
+
+@pytest.mark.parametrize(("requested", "bound"), [(3, 3), (100, 16), (0, 1)])
+def test_concurrency_is_bounded(make_client: ClientFactory, requested: int, bound: int) -> None:
+    in_flight = peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json={})
+
+    client = make_client(handler)
+    limiter = client._guards["crm"].limiter
+    limiter.limit = limiter.max_limit = 64  # the module limiter must not be the bound under test
+    out = get_many(client, entity="lead", ids=[str(i) for i in range(40)], concurrency=requested)
+    assert len(out["results"]) == 40
+    assert peak == bound
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+from holded_mcp.cache import DiskCache, cache_key, endpoint_ttl
+
+
+def test_endpoint_ttl_covers_collections_and_records_only() -> None:
+    assert endpoint_ttl("projects", "/projects") is not None
+    assert endpoint_ttl("projects", "/projects/P1") is not None
+    assert endpoint_ttl("projects", "/projects/P1/tasks") is None
+    assert endpoint_ttl("team", "/employees/E1/times") is None
+    assert endpoint_ttl("invoicing", "/documents/invoice") is None
+
+
+def test_disk_cache_is_namespaced_by_account(tmp_path: Path) -> None:
+    key = cache_key("invoicing", "/contacts/1")
+    a = DiskCache(tmp_path / "cache.db", namespace="a")
+    b = DiskCache(tmp_path / "cache.db", namespace="b")
+    a.set(key, {"id": "1"}, 60)
+    assert a.get(key)[:2] == (True, {"id": "1"})
+    assert b.get(key)[0] is False
+    b.invalidate("invoicing", "/contacts")
+    assert a.get(key)[0] is True
+    a.close()
+    b.close()
+
+
+def test_locked_invalidation_is_deferred_not_raised(tmp_path: Path) -> None:
+    path = tmp_path / "cache.db"
+    cache = DiskCache(path)
+    key = cache_key("invoicing", "/contacts/1")
+    cache.set(key, {"id": "1"}, 60)
+
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")  # another process holds the write lock
+    cache.invalidate("invoicing", "/contacts")
+    assert cache.get(key)[0] is False  # stale entry is hidden while the delete is pending
+    assert cache.stats()["pending_invalidations"] == 1
+    other.execute("COMMIT")
+
+    assert cache.get(key)[0] is False
+    assert cache.stats() == {**cache.stats(), "entries": 0, "pending_invalidations": 0}
+    other.close()
+    cache.close()
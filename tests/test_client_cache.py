@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from pathlib import Path
+
+import httpx
+
+from holded_mcp.client import HoldedClient
+from holded_mcp.compact import CompactTable
+
+ClientFactory = Callable[..., HoldedClient]
+
+ROWS = [{"id": str(i), "accountNumber": 57200000 + i, "name": f"Account {i}"} for i in range(100)]
+
+
+def test_plain_cached_get_stores_dicts_and_get_compact_stores_columns(make_client: ClientFactory) -> None:
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(200, json=ROWS)
+
+    async def run() -> None:
+        client = make_client(handler)
+        first = await client.get("/contacts", cached=True)
+        assert await client.get("/contacts", cached=True) is first  # no rebuild per hit
+        table = await client.get_compact("/chartofaccounts", module="accounting")
+        assert isinstance(table, CompactTable)
+        assert await client.get_compact("/chartofaccounts", module="accounting") is table
+        assert 57200042 in table.distinct("accountNumber")
+        assert calls == 2
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_waiters_take_over_when_leader_is_cancelled(make_client: ClientFactory) -> None:
+    calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"id": "1"})
+
+    async def run() -> None:
+        client = make_client(handler)
+        leader = asyncio.create_task(client.get("/contacts/1", cached=True))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(client.get("/contacts/1", cached=True))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        assert await waiter == {"id": "1"}
+        assert leader.cancelled() and calls == 2
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_write_during_inflight_get_is_not_overwritten_by_old_data(
+    make_client: ClientFactory, tmp_path: Path
+) -> None:
+    name = "old"
+    get_started = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal name
+        if request.method == "PUT":
+            name = "new"
+            return httpx.Response(200, json={"status": 1})
+        body = {"id": "1", "name": name}
+        get_started.set()
+        await asyncio.sleep(0.05)  # the PUT lands while this response is in flight
+        return httpx.Response(200, json=body)
+
+    async def run() -> None:
+        client = make_client(handler, cache_path=tmp_path / "cache.db")
+        in_flight = asyncio.create_task(client.get("/contacts/1"))
+        await get_started.wait()
+        await client.put("/contacts/1", json={"name": "new"})
+        assert await client.get("/contacts/1") == {"id": "1", "name": "new"}  # does not join the old GET
+        assert await in_flight == {"id": "1", "name": "old"}
+        assert await client.get("/contacts/1") == {"id": "1", "name": "new"}
+        client.cache.clear()  # what another process sees through the shared disk tier
+        assert await client.get("/contacts/1") == {"id": "1", "name": "new"}
+        await client.close()
+
+    asyncio.run(run())
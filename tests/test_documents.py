@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from collections import Counter
+from collections.abc import Callable
+
+import httpx
+from mcp.server.fastmcp import FastMCP
+
+from holded_mcp.client import HoldedClient
+from holded_mcp.tools.documents import register
+
+ClientFactory = Callable[..., HoldedClient]
+
+PAGE = [
+    {
+        "id": f"D{n}",
+        "contact": "C1",
+        "products": [{"productId": "P1", "units": 1}, {"productId": "P2" if n % 2 else "P1", "units": 2}],
+        "paymentsDetail": [{"treasury": "T1", "amount": 5}],
+    }
+    for n in range(25)
+]
+
+
+def list_documents(client: HoldedClient, **arguments: object) -> list:
+    mcp = FastMCP("test")
+    register(mcp, client)
+    result = asyncio.run(mcp.call_tool("list_documents", {"doc_type": "invoice", **arguments}))
+    content = result[0] if isinstance(result, tuple) else result
+    return [json.loads(c.text) for c in content]  # FastMCP returns one content item per list element
+
+
+def holded(requests: Counter[str], fail: tuple[str, ...] = ()) -> Callable[[httpx.Request], httpx.Response]:
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path.split("/v1", 1)[1]
+        requests[path] += 1
+        if path.startswith(fail):
+            return httpx.Response(503, json={"error": "unavailable"})
+        if path.startswith("/documents/"):
+            return httpx.Response(200, json=json.loads(json.dumps(PAGE)))
+        if path == "/treasury":
+            return httpx.Response(200, json=[{"id": "T1", "name": "Bank"}])
+        return httpx.Response(200, json={"id": path.rsplit("/", 1)[1], "sku": "S", "email": "x@example.com"})
+
+    return handler
+
+
+def test_each_referenced_record_is_fetched_once_per_page(make_client: ClientFactory) -> None:
+    requests: Counter[str] = Counter()
+    docs = list_documents(
+        make_client(holded(requests)), enrich={"contact": ["email"], "products": ["sku"], "treasury": ["name"]}
+    )
+    assert requests == Counter({
+        "/documents/invoice": 1, "/contacts/C1": 1, "/products/P1": 1, "/products/P2": 1, "/treasury": 1,
+    })
+    assert docs[0]["contactInfo"] == {"email": "x@example.com"}
+    assert docs[1]["products"][1]["productInfo"] == {"sku": "S"}
+    assert docs[2]["paymentsDetail"][0]["treasuryInfo"] == {"name": "Bank"}
+
+
+def test_failed_lookups_are_attached_per_row(make_client: ClientFactory) -> None:
+    requests: Counter[str] = Counter()
+    client = make_client(holded(requests, fail=("/treasury", "/contacts")))
+    docs = list_documents(client, enrich={"contact": [], "products": ["sku"], "treasury": []})
+    assert len(docs) == len(PAGE)
+    assert docs[0]["contactInfo"] == {"error": "HTTP 503"}
+    assert docs[0]["paymentsDetail"][0]["treasuryInfo"] == {"error": "HTTP 503"}
+    assert docs[0]["products"][0]["productInfo"] == {"sku": "S"}
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import gzip
+import json
+from collections.abc import Callable
+from pathlib import Path
+
+import httpx
+import pytest
+from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp.exceptions import ToolError
+
+from holded_mcp.client import HoldedClient
+from holded_mcp.tools.export import register
+
+ClientFactory = Callable[..., HoldedClient]
+
+LEDGER = [
+    {"entryNumber": 1, "line": 1, "account": 57200001, "debit": 10},
+    {"entryNumber": 1, "line": 2, "account": 70000001, "credit": 10},
+]
+
+
+def test_iter_pages_stops_when_rows_without_id_repeat(make_client: ClientFactory) -> None:
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(200, json=LEDGER)  # ignores ?page=
+
+    async def run() -> list[list[dict]]:
+        client = make_client(handler)
+        return [rows async for rows in client.iter_pages("/dailyledger", module="accounting")]
+
+    assert asyncio.run(asyncio.wait_for(run(), 5)) == [LEDGER]
+    assert calls == 2
+
+
+DOCUMENTS = [
+    {
+        "id": "D1",
+        "docNumber": "F001",
+        "total": 12.1,
+        "billAddress": {"city": "Valencia", "country": "ES"},
+        "tags": ["vip"],
+        "products": [{"name": "Widget", "units": 2}, {"name": "Gadget", "units": 1}],
+    },
+    {"id": "D2", "docNumber": "F002", "total": 5, "billAddress": {"city": "Madrid"}, "products": []},
+]
+
+
+def documents_handler(request: httpx.Request) -> httpx.Response:
+    page = int(request.url.params.get("page", "1"))
+    return httpx.Response(200, json=DOCUMENTS if page == 1 else [])
+
+
+def export(client: HoldedClient, **arguments: object) -> dict:
+    """Call the export_dataset tool through FastMCP and decode its JSON result."""
+    mcp = FastMCP("test")
+    register(mcp, client)
+    result = asyncio.run(mcp.call_tool("export_dataset", arguments))
+    content = result[0] if isinstance(result, tuple) else result
+    return json.loads(content[0].text)
+
+
+def read_ndjson(path: str) -> list[dict]:
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh]
+
+
+def read_csv(path: str) -> list[dict]:
+    with gzip.open(path, "rt", encoding="utf-8", newline="") as fh:
+        return list(csv.DictReader(fh))
+
+
+def test_ndjson_export_flattens_and_splits_child_tables(make_client: ClientFactory, tmp_path: Path) -> None:
+    out = export(make_client(documents_handler), dataset="documents", doc_type="invoice", output_dir=str(tmp_path))
+    assert out["rows"] == 2
+    rows = read_ndjson(out["path"])
+    assert rows[0] == {
+        "id": "D1", "docNumber": "F001", "total": 12.1,
+        "billAddress.city": "Valencia", "billAddress.country": "ES", "tags": '["vip"]',
+    }
+    assert rows[1]["products"] == "[]"  # an empty list stays in the parent row
+    child = out["child_tables"]["products"]
+    assert child["rows"] == 2
+    assert read_ndjson(child["path"]) == [
+        {"_parent_id": "D1", "_line": 0, "name": "Widget", "units": 2},
+        {"_parent_id": "D1", "_line": 1, "name": "Gadget", "units": 1},
+    ]
+
+
+def test_csv_export_uses_the_union_of_columns(make_client: ClientFactory, tmp_path: Path) -> None:
+    out = export(make_client(documents_handler), dataset="documents", doc_type="invoice", format="csv",
+                 output_dir=str(tmp_path))
+    rows = read_csv(out["path"])
+    assert list(rows[0]) == ["id", "docNumber", "total", "billAddress.city", "billAddress.country", "tags", "products"]
+    assert rows[1]["billAddress.city"] == "Madrid" and rows[1]["billAddress.country"] == ""
+    assert read_csv(out["child_tables"]["products"]["path"])[1] == {
+        "_parent_id": "D1", "_line": "1", "name": "Gadget", "units": "1",
+    }
+    assert sorted(p.name.endswith(".csv.gz") for p in tmp_path.iterdir()) == [True, True]  # no spools left
+
+
+def test_exports_started_together_get_distinct_files(make_client: ClientFactory, tmp_path: Path) -> None:
+    client = make_client(documents_handler)
+    first = export(client, dataset="documents", doc_type="invoice", output_dir=str(tmp_path))
+    second = export(client, dataset="documents", doc_type="invoice", output_dir=str(tmp_path))
+    assert first["path"] != second["path"]
+
+
+def test_time_filters_are_rejected_for_undated_datasets(make_client: ClientFactory, tmp_path: Path) -> None:
+    with pytest.raises(ToolError, match="only apply to: documents, ledger"):
+        export(make_client(documents_handler), dataset="contacts", starttmp=1, output_dir=str(tmp_path))
+
+
+def test_ledger_export_ends_when_page_is_ignored(make_client: ClientFactory, tmp_path: Path) -> None:
+    client = make_client(lambda request: httpx.Response(200, json=LEDGER))
+    out = export(client, dataset="ledger", format="csv", output_dir=str(tmp_path))
+    assert out["rows"] == 2
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+
+import httpx
+import pytest
+
+from holded_mcp import client as client_module
+from holded_mcp.client import HoldedClient
+from holded_mcp.resilience import FAILURE_THRESHOLD, CircuitOpenError
+
+ClientFactory = Callable[..., HoldedClient]
+
+
+def counting(status: int | Callable[[httpx.Request], int]) -> tuple[list[httpx.Request], Callable]:
+    seen: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        code = status(request) if callable(status) else status
+        return httpx.Response(code, json={"id": "1"} if code < 400 else {"error": "x"})
+
+    return seen, handler
+
+
+async def fail_times(client: HoldedClient, n: int, module: str = "invoicing") -> None:
+    for _ in range(n):
+        with pytest.raises((httpx.HTTPStatusError, httpx.TransportError)):
+            await client.get("/contacts", module=module)
+
+
+@pytest.mark.parametrize("status", [500, 503, 429])
+def test_breaker_opens_after_consecutive_failures(status: int, make_client: ClientFactory) -> None:
+    async def run() -> None:
+        seen, handler = counting(status)
+        client = make_client(handler)
+        await fail_times(client, FAILURE_THRESHOLD - 1)
+        assert client._guards["invoicing"].breaker.state == "closed"
+        await fail_times(client, 1)
+        assert client._guards["invoicing"].breaker.state == "open"
+        assert len(seen) == FAILURE_THRESHOLD
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_breaker_opens_on_transport_errors(make_client: ClientFactory) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("connection refused", request=request)
+
+    async def run() -> None:
+        client = make_client(handler)
+        await fail_times(client, FAILURE_THRESHOLD)
+        assert client._guards["invoicing"].breaker.state == "open"
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_client_errors_do_not_open_breaker(make_client: ClientFactory) -> None:
+    async def run() -> None:
+        _, handler = counting(404)
+        client = make_client(handler)
+        await fail_times(client, FAILURE_THRESHOLD * 2)
+        assert client._guards["invoicing"].breaker.state == "closed"
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_open_circuit_fails_fast_without_sending(make_client: ClientFactory) -> None:
+    async def run() -> None:
+        seen, handler = counting(500)
+        client = make_client(handler)
+        await fail_times(client, FAILURE_THRESHOLD)
+        with pytest.raises(CircuitOpenError):
+            await client.get("/contacts")
+        assert len(seen) == FAILURE_THRESHOLD
+        assert client._guards["invoicing"].rejected == 1
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_single_half_open_probe_recovers(make_client: ClientFactory) -> None:
+    healthy = False
+    release = asyncio.Event()
+    seen: list[httpx.Request] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        if not healthy:
+            return httpx.Response(500)
+        await release.wait()
+        return httpx.Response(200, json={"id": "1"})
+
+    async def run() -> None:
+        nonlocal healthy
+        client = make_client(handler)
+        breaker = client._guards["invoicing"].breaker
+        await fail_times(client, FAILURE_THRESHOLD)
+        breaker.opened_at -= breaker.reset_timeout  # the reset timeout has elapsed
+        healthy = True
+
+        probe = asyncio.create_task(client.get("/contacts"))
+        while len(seen) == FAILURE_THRESHOLD:
+            await asyncio.sleep(0)
+        assert breaker.state == "half_open"
+        with pytest.raises(CircuitOpenError, match="probe in progress"):
+            await client.get("/contacts")
+        assert len(seen) == FAILURE_THRESHOLD + 1
+
+        release.set()
+        assert await probe == {"id": "1"}
+        assert breaker.state == "closed"
+        assert await client.get("/contacts") == {"id": "1"}
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_failed_probe_reopens_circuit(make_client: ClientFactory) -> None:
+    async def run() -> None:
+        _, handler = counting(503)
+        client = make_client(handler)
+        breaker = client._guards["invoicing"].breaker
+        await fail_times(client, FAILURE_THRESHOLD)
+        breaker.opened_at -= breaker.reset_timeout
+        await fail_times(client, 1)
+        assert breaker.state == "open"
+        with pytest.raises(CircuitOpenError):
+            await client.get("/contacts")
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_limit_decreases_on_slow_responses(make_client: ClientFactory) -> None:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"id": "1"})
+
+    async def run() -> None:
+        client = make_client(handler)
+        limiter = client._guards["invoicing"].limiter
+        limiter.target_latency = 0.01
+        before = limiter.limit
+        await client.get("/contacts")
+        assert limiter.limit == before * limiter.decrease_factor
+        assert limiter.latency_ewma is not None and limiter.latency_ewma >= 0.05
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_limit_decreases_once_per_window_and_grows_back(make_client: ClientFactory) -> None:
+    async def slow(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.02)
+        return httpx.Response(200, json={"id": "1"})
+
+    async def run() -> None:
+        client = make_client(slow)
+        limiter = client._guards["invoicing"].limiter
+        limiter.target_latency = 0.015
+        start = limiter.limit
+        await asyncio.gather(*(client.get("/contacts") for _ in range(4)))
+        assert limiter.limit == start * limiter.decrease_factor
+
+        limiter.target_latency = 10.0  # every call is now fast
+        reduced = limiter.limit
+        for _ in range(8):
+            await client.get("/contacts")
+        assert limiter.limit > reduced
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_modules_are_isolated(make_client: ClientFactory) -> None:
+    async def run() -> None:
+        seen, handler = counting(lambda r: 500 if "/invoicing/" in r.url.path else 200)
+        client = make_client(handler)
+        await fail_times(client, FAILURE_THRESHOLD, module="invoicing")
+        with pytest.raises(CircuitOpenError):
+            await client.get("/contacts", module="invoicing")
+        assert await client.get("/chartofaccounts", module="accounting") == {"id": "1"}
+        assert client._guards["accounting"].breaker.state == "closed"
+        assert client._guards["accounting"].limiter.limit > client._guards["invoicing"].limiter.limit
+        await client.close()
+
+    asyncio.run(run())
+
+
+async def serve_holded(slow_module: str, delay: float) -> tuple[asyncio.AbstractServer, str]:
+    """Minimal keep-alive HTTP/1.1 server on 127.0.0.1 where one module answers after ``delay``."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                target = head.split(b" ", 2)[1].decode()
+                if f"/api/{slow_module}/" in target:
+                    await asyncio.sleep(delay)
+                body = b'{"id":"1"}'
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: %d\r\n\r\n%s" % (len(body), body)
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    host, port = server.sockets[0].getsockname()[:2]
+    return server, f"http://{host}:{port}"
+
+
+def test_slow_module_does_not_tie_up_shared_pool(
+    make_client: ClientFactory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def run() -> None:
+        server, origin = await serve_holded("invoicing", delay=0.5)
+        for module in client_module.BASE_URLS:
+            monkeypatch.setitem(client_module.BASE_URLS, module, f"{origin}/api/{module}/v1")
+        # A pool smaller than the slow burst: without per-module limits the burst would take every connection.
+        client = make_client(transport=httpx.AsyncHTTPTransport(limits=httpx.Limits(max_connections=16)))
+        slow = [asyncio.create_task(client.get("/contacts")) for _ in range(40)]
+        await asyncio.sleep(0.05)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        assert await client.get("/chartofaccounts", module="accounting") == {"id": "1"}
+        assert loop.time() - start < 0.25
+        assert client._guards["invoicing"].limiter.in_flight <= client._guards["invoicing"].limiter.max_limit
+        for task in slow:
+            task.cancel()
+        await asyncio.gather(*slow, return_exceptions=True)
+        await client.close()
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(run())
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from pathlib import Path
+
+import pytest
+from mcp.server.fastmcp import FastMCP
+
+from holded_mcp.tracing import Span, Tracer, instrument
+
+
+def test_http_wall_counts_overlapping_requests_once() -> None:
+    span = Span("tool/x", "SPAN_KIND_INTERNAL", "t", "s", None)
+    span.http_intervals = [(0, 100), (50, 150), (200, 250)]
+    assert span.http_wall() == 200 / 1e9
+
+
+def test_slow_call_log_uses_wall_time_for_concurrent_requests(caplog: pytest.LogCaptureFixture) -> None:
+    tracer = Tracer(slow_call_ms=0)
+
+    async def request() -> None:
+        with tracer.http_span("GET", "https://example.test") as span:
+            await asyncio.sleep(0.05)
+            span.phases["server"] += 0.05
+
+    async def tool() -> Span | None:
+        with tracer.span("tool/fan_out") as span:
+            await asyncio.gather(*(request() for _ in range(4)))
+        return span
+
+    with caplog.at_level(logging.WARNING, logger="holded_mcp"):
+        span = asyncio.run(tool())
+    assert span.phases["server"] == pytest.approx(0.2)  # cumulative over the 4 requests
+    assert span.http_wall() < 0.1
+    assert "cumulative HTTP phases: server=200.0ms" in caplog.text
+
+
+def test_tool_spans_time_fastmcp_serialization(caplog: pytest.LogCaptureFixture, tmp_path: Path) -> None:
+    trace_file = tmp_path / "spans.jsonl"
+    tracer = Tracer(trace_file=str(trace_file), slow_call_ms=0)
+    mcp = instrument(FastMCP("test"), tracer)
+
+    @mcp.tool()
+    async def big_list() -> list:
+        return [{"id": str(i), "name": f"Row {i}", "tags": ["a", "b"]} for i in range(5000)]
+
+    with caplog.at_level(logging.WARNING, logger="holded_mcp"):
+        content = asyncio.run(mcp.call_tool("big_list", {}))
+    assert len(content[0] if isinstance(content, tuple) else content) == 5000
+    span = json.loads(trace_file.read_text().splitlines()[-1])
+    attributes = {a["key"]: a["value"] for a in span["attributes"]}
+    assert span["name"] == "tool/big_list"
+    assert attributes["phase.serialize_ms"]["doubleValue"] > 0
+    assert "serialize=" in caplog.text and "serialize=0.0ms" not in caplog.text
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+
+import httpx
+import pytest
+
+from holded_mcp.client import HoldedClient
+from holded_mcp.validation import (
+    ValidationError,
+    validate_document,
+    validate_ledger_entry,
+    validate_payment,
+    validate_send,
+)
+
+ClientFactory = Callable[..., HoldedClient]
+
+BALANCED = {
+    "date": 1700000000,
+    "lines": [{"account": 57200001, "debit": 100.10}, {"account": 70000001, "credit": 100.10}],
+}
+
+
+def errors_of(call: Callable[[], object]) -> list[str]:
+    with pytest.raises(ValidationError) as info:
+        call()
+    return info.value.errors
+
+
+def chart_handler(*charts: list[int]) -> tuple[list[httpx.Request], Callable[[httpx.Request], httpx.Response]]:
+    """Serve each chart in turn (the last one repeats) as the chart of accounts."""
+    seen: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        numbers = charts[min(len(seen), len(charts)) - 1]
+        return httpx.Response(200, json=[{"id": str(n), "accountNumber": n} for n in numbers])
+
+    return seen, handler
+
+
+def test_validate_document_accepts_valid_payload() -> None:
+    validate_document("invoice", {"date": 1700000000, "items": [{"name": "Widget", "units": 2, "subtotal": 9.5}]})
+
+
+def test_validate_document_reports_unknown_doc_type_and_wrong_item_types() -> None:
+    errors = errors_of(lambda: validate_document(
+        "bill", {"date": "today", "items": [{"units": "two", "subtotal": True}, "widget"]}
+    ))
+    assert errors[0].startswith("doc_type: unknown 'bill'")
+    assert "date: expected int, got str" in errors
+    assert "items[0].units: expected number, got str" in errors
+    assert "items[0].subtotal: expected number, got bool" in errors
+    assert "items[1]: expected an object" in errors
+
+
+def test_validate_document_requires_date() -> None:
+    assert errors_of(lambda: validate_document("invoice", {})) == ["date: required"]
+
+
+def test_validate_payment() -> None:
+    validate_payment("invoice", {"date": 1700000000, "amount": 10})
+    assert errors_of(lambda: validate_payment("invoice", {"date": 1700000000, "amount": 0})) == [
+        "amount: must be greater than 0"
+    ]
+    assert errors_of(lambda: validate_payment("invoice", {"date": 1700000000})) == ["amount: required"]
+
+
+def test_validate_send_checks_lengths_and_emails() -> None:
+    validate_send("invoice", {"emails": "a@example.com, b@example.com"})
+    errors = errors_of(lambda: validate_send(
+        "invoice", {"emails": "a@example.com", "subject": "Hi", "message": "Too short"}
+    ))
+    assert errors == [
+        "subject: must have at least 10 characters",
+        "message: must have at least 20 characters",
+    ]
+    assert errors_of(lambda: validate_send("invoice", {"emails": "a@example.com,nobody"})) == [
+        "emails: 'nobody' is not an email address"
+    ]
+
+
+def test_ledger_entry_rejects_unbalanced_and_double_sided_lines(make_client: ClientFactory) -> None:
+    client = make_client(chart_handler([57200001, 70000001])[1])
+    entry = {"date": 1700000000, "lines": [
+        {"account": 57200001, "debit": 50, "credit": 50},
+        {"account": 70000001, "credit": 20},
+        {"account": 70000001},
+    ]}
+    with pytest.raises(ValidationError) as info:
+        asyncio.run(validate_ledger_entry(client, entry))
+    assert info.value.errors == [
+        "lines[0]: cannot have both debit and credit",
+        "lines[2]: needs a debit or a credit amount",
+        "lines: debits (50.00) do not equal credits (70.00)",
+    ]
+
+
+def test_ledger_entry_balances_in_cents(make_client: ClientFactory) -> None:
+    client = make_client(chart_handler([57200001, 70000001])[1])
+    # 0.1 + 0.2 != 0.3 in floating point, but the amounts balance to the cent.
+    entry = {"date": 1700000000, "lines": [
+        {"account": 57200001, "debit": 0.1}, {"account": 57200001, "debit": 0.2},
+        {"account": 70000001, "credit": 0.3},
+    ]}
+    asyncio.run(validate_ledger_entry(client, entry))
+    off_by_a_cent = {"date": 1700000000, "lines": [
+        {"account": 57200001, "debit": 0.1}, {"account": 70000001, "credit": 0.11},
+    ]}
+    with pytest.raises(ValidationError, match=r"debits \(0.10\) do not equal credits \(0.11\)"):
+        asyncio.run(validate_ledger_entry(client, off_by_a_cent))
+
+
+def test_ledger_entry_structure_errors() -> None:
+    errors = errors_of(lambda: asyncio.run(validate_ledger_entry(None, {"lines": [{"account": "572"}]})))
+    assert errors == ["date: required", "lines: must have at least 2 items", "lines[0].account: expected int, got str"]
+
+
+def test_ledger_entry_checks_accounts_against_chart(make_client: ClientFactory) -> None:
+    seen, handler = chart_handler([57200001, 70000001])
+    client = make_client(handler)
+    asyncio.run(validate_ledger_entry(client, BALANCED))
+    entry = {**BALANCED, "lines": [BALANCED["lines"][0], {"account": 70000099, "credit": 100.10}]}
+    with pytest.raises(ValidationError, match="70000099 is not in the chart of accounts"):
+        asyncio.run(validate_ledger_entry(client, entry))
+    assert len(seen) == 2  # cached chart, then one fresh copy before rejecting
+
+
+def test_ledger_entry_refetches_chart_for_new_accounts(make_client: ClientFactory) -> None:
+    seen, handler = chart_handler([57200001], [57200001, 70000001])
+    client = make_client(handler)
+
+    async def run() -> None:
+        await validate_ledger_entry(client, {**BALANCED, "lines": [
+            {"account": 57200001, "debit": 1}, {"account": 57200001, "credit": 1},
+        ]})
+        await validate_ledger_entry(client, BALANCED)  # 70000001 was created since the chart was cached
+        await validate_ledger_entry(client, BALANCED)  # the refreshed chart is now the cached one
+
+    asyncio.run(run())
+    assert len(seen) == 2
+
+
+def test_ledger_entry_skips_account_check_when_chart_is_unavailable(make_client: ClientFactory) -> None:
+    client = make_client(lambda request: httpx.Response(503))
+    asyncio.run(validate_ledger_entry(client, {**BALANCED, "lines": [
+        {"account": 1, "debit": 5}, {"account": 2, "credit": 5},
+    ]}))
+
+    no_get = HoldedClient(api_key="test", allowed_methods="POST")
+    asyncio.run(validate_ledger_entry(no_get, BALANCED))
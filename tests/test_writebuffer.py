@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import Callable
+
+import httpx
+import pytest
+
+from holded_mcp.client import HoldedClient
+from holded_mcp.writebuffer import StockWriteBuffer
+
+ClientFactory = Callable[..., HoldedClient]
+
+
+def test_merges_concurrent_updates_into_one_put(make_client: ClientFactory) -> None:
+    bodies: list[dict] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        bodies.append(json.loads(request.content))
+        return httpx.Response(200, json={"status": 1})
+
+    async def run() -> None:
+        buffer = StockWriteBuffer(make_client(handler), window=0.01)
+        results = await asyncio.gather(
+            buffer.submit("P1", {"stock": {"W1": {"V1": 1}}}),
+            buffer.submit("P1", {"stock": {"W1": {"V2": 2}}}),
+        )
+        assert results == [{"status": 1}, {"status": 1}]
+        assert bodies == [{"stock": {"W1": {"V1": 1, "V2": 2}}}]
+
+    asyncio.run(run())
+
+
+def test_rejected_merged_put_is_resent_per_caller(make_client: ClientFactory) -> None:
+    bodies: list[dict] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        bodies.append(body)
+        if "bad" in body["stock"]["W1"]:
+            return httpx.Response(400, json={"error": "unknown variant"})
+        return httpx.Response(200, json={"status": 1})
+
+    async def run() -> None:
+        buffer = StockWriteBuffer(make_client(handler), window=0.01)
+        good, bad = await asyncio.gather(
+            buffer.submit("P1", {"stock": {"W1": {"V1": 1}}}),
+            buffer.submit("P1", {"stock": {"W1": {"bad": 2}}}),
+            return_exceptions=True,
+        )
+        assert good == {"status": 1}
+        assert isinstance(bad, httpx.HTTPStatusError) and bad.response.status_code == 400
+        assert bodies[1:] == [{"stock": {"W1": {"V1": 1}}}, {"stock": {"W1": {"bad": 2}}}]
+
+    asyncio.run(run())
+
+
+def test_server_errors_fail_every_caller_without_resending(make_client: ClientFactory) -> None:
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(503)
+
+    async def run() -> None:
+        buffer = StockWriteBuffer(make_client(handler), window=0.01)
+        results = await asyncio.gather(
+            buffer.submit("P1", {"stock": {"W1": {"V1": 1}}}),
+            buffer.submit("P1", {"stock": {"W1": {"V2": 2}}}),
+            return_exceptions=True,
+        )
+        assert all(isinstance(r, httpx.HTTPStatusError) for r in results)
+        assert calls == 1
+
+    asyncio.run(run())
+
+
+def test_cancelled_drain_fails_pending_callers(make_client: ClientFactory) -> None:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(10)
+        return httpx.Response(200, json={})
+
+    async def run() -> None:
+        buffer = StockWriteBuffer(make_client(handler), window=0.01)
+        first = asyncio.create_task(buffer.submit("P1", {"stock": {"W1": {"V1": 1}}}))
+        await asyncio.sleep(0.05)  # first batch is in flight
+        second = asyncio.create_task(buffer.submit("P1", {"stock": {"W1": {"V1": 2}}}))
+        await asyncio.sleep(0)
+        buffer._drains["P1"].cancel()
+        for task in (first, second):
+            with pytest.raises(RuntimeError, match="interrupted"):
+                await asyncio.wait_for(task, 1)
+        assert buffer.stats()["pending_products"] == 0
+
+    asyncio.run(run())